@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from dateutil import parser
 
@@ -61,6 +62,142 @@ def preprocess_transformations(df: pd.DataFrame, transformations: dict) -> pd.Da
     return df_out
 
 
+# Códigos de transformación (transf_m / transf_q)
+TRANSFORM_CODES = {
+    0: 'nivel',
+    1: 'primera diferencia',
+    2: 'logaritmo',
+    3: 'diferencia logarítmica (x100)',
+    4: 'tasa de variación (%)',
+    5: 'tasa interanual (%)',
+    6: 'tasa de variación de la media de 3 meses (%)',
+}
+
+
+def apply_transform_codes(df: pd.DataFrame, transf_m, transf_q=None) -> pd.DataFrame:
+    """
+    Aplica los códigos de transformación a un panel con el formato de xest.
+
+    Las columnas que comparten código y frecuencia se transforman con una única
+    operación de NumPy y se escriben de vuelta en df (no se copia el panel
+    completo). Las series trimestrales están en filas mensuales, por lo que su
+    periodo anterior está 3 filas antes; la tasa interanual usa siempre 12 filas.
+
+    Args:
+        df: DataFrame con series mensuales seguidas de trimestrales (se modifica).
+        transf_m: códigos de las series mensuales (ver TRANSFORM_CODES).
+        transf_q: códigos de las series trimestrales.
+
+    Returns:
+        df transformado.
+    """
+    for cols, code, step in _code_groups(df, transf_m, transf_q):
+        X = df.iloc[:, cols].to_numpy(dtype=float)
+        df.iloc[:, cols] = _transform_block(X, code, step)
+    return df
+
+
+def invert_transform_codes(df: pd.DataFrame, transf_m, transf_q, levels: pd.DataFrame) -> pd.DataFrame:
+    """
+    Devuelve a niveles un panel transformado (p.ej. nowcasts y previsiones).
+
+    Donde levels tiene dato se mantiene; en el resto de filas con valor
+    transformado el nivel se reconstruye hacia delante a partir de los niveles
+    anteriores, con una operación vectorizada por código para cada fecha.
+
+    Args:
+        df: DataFrame transformado con apply_transform_codes (mismas columnas que levels).
+        transf_m: códigos de las series mensuales.
+        transf_q: códigos de las series trimestrales.
+        levels: DataFrame con los niveles observados.
+
+    Returns:
+        DataFrame de niveles con el índice y las columnas de df.
+    """
+    out = levels.reindex(index=df.index, columns=df.columns).astype(float)
+    for cols, code, step in _code_groups(df, transf_m, transf_q):
+        Y = df.iloc[:, cols].to_numpy(dtype=float)
+        L = out.iloc[:, cols].to_numpy(dtype=float, copy=True)
+        out.iloc[:, cols] = _invert_block(Y, L, code, step)
+    return out
+
+
+def _code_groups(df: pd.DataFrame, transf_m, transf_q):
+    """
+    Posiciones de columna agrupadas por (código, paso entre periodos).
+    """
+    codes_m = np.asarray(transf_m, dtype=int).ravel()
+    codes_q = np.asarray(transf_q if transf_q is not None else [], dtype=int).ravel()
+    if len(codes_m) + len(codes_q) != df.shape[1]:
+        raise ValueError("El número de códigos no coincide con el número de columnas.")
+    codes = np.concatenate([codes_m, codes_q])
+    steps = np.concatenate([np.ones(len(codes_m), dtype=int), np.full(len(codes_q), 3)])
+    unknown = set(codes.tolist()) - set(TRANSFORM_CODES)
+    if unknown:
+        raise ValueError(f"Códigos de transformación no válidos: {sorted(unknown)}")
+    if ((codes == 6) & (steps == 3)).any():
+        raise ValueError("El código 6 solo se aplica a series mensuales.")
+    for code, step in sorted(set(zip(codes.tolist(), steps.tolist()))):
+        yield np.flatnonzero((codes == code) & (steps == step)), code, step
+
+
+def _transform_block(X: np.ndarray, code: int, step: int) -> np.ndarray:
+    """
+    Transformación de un bloque T x k de columnas con el mismo código.
+    """
+    lag = 12 if code == 5 else step
+    out = np.full_like(X, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if code == 0:
+            out[:] = X
+        elif code == 2:
+            out[:] = np.log(X)
+        elif code == 6:
+            m3 = np.full_like(X, np.nan)
+            m3[2:] = (X[2:] + X[1:-1] + X[:-2]) / 3
+            out[3:] = 100 * (m3[3:] / m3[:-3] - 1)
+        elif lag < X.shape[0]:
+            cur, prev = X[lag:], X[:-lag]
+            if code == 1:
+                out[lag:] = cur - prev
+            elif code == 3:
+                out[lag:] = 100 * (np.log(cur) - np.log(prev))
+            else:
+                out[lag:] = 100 * (cur / prev - 1)
+    return out
+
+
+def _invert_block(Y: np.ndarray, L: np.ndarray, code: int, step: int) -> np.ndarray:
+    """
+    Reconstruye los niveles L (T x k) donde faltan a partir del bloque transformado Y.
+    """
+    lag = 12 if code == 5 else step
+    need = np.isnan(L) & ~np.isnan(Y)
+    for t in np.flatnonzero(need.any(axis=1)):
+        y = Y[t]
+        if code == 0:
+            level = y
+        elif code == 2:
+            level = np.exp(y)
+        elif code == 6:
+            if t < 5:
+                continue
+            prev_mean = (L[t - 3] + L[t - 4] + L[t - 5]) / 3
+            level = 3 * prev_mean * (1 + y / 100) - L[t - 1] - L[t - 2]
+        else:
+            if t < lag:
+                continue
+            prev = L[t - lag]
+            if code == 1:
+                level = prev + y
+            elif code == 3:
+                level = prev * np.exp(y / 100)
+            else:
+                level = prev * (1 + y / 100)
+        L[t, need[t]] = level[need[t]]
+    return L
+
+
 def parse_date_column(df: pd.DataFrame, date_col: str, fmt: str = None) -> pd.DataFrame:
     """
     Convierte una columna de fechas a datetime.
@@ -94,3 +231,86 @@ def align_vintages(data: pd.DataFrame, date_col: str, vintage_col: str) -> pd.Da
     pivoted = data.pivot(index=date_col, columns=vintage_col, values='value')
     pivoted = pivoted.sort_index().sort_index(axis=1)
     return pivoted
+
+
+class AsOfIndex:
+    """
+    Índice para reconstruir el panel disponible en cualquier fecha (as-of).
+
+    Se construye una sola vez a partir de una tabla larga de vintages
+    (fecha, vintage, serie, valor): para cada serie se guardan sus fechas de
+    publicación ordenadas y una matriz (vintages de la serie x fechas) con la
+    serie completa conocida tras cada publicación. Una consulta hace una
+    búsqueda binaria por serie y copia la fila correspondiente, sin filtrar ni
+    pivotar la tabla completa.
+
+    Attributes:
+        dates: DatetimeIndex de fechas de referencia del panel.
+        series: lista de series (mensuales primero, trimestrales después).
+        nM: número de series mensuales.
+    """
+
+    def __init__(self, data: pd.DataFrame, monthly: list, quarterly: list = None,
+                 date_col: str = 'date', vintage_col: str = 'vintage',
+                 series_col: str = 'series', value_col: str = 'value', dates=None):
+        """
+        Args:
+            data: DataFrame en formato largo; cada fila es la publicación de un valor
+                  (una revisión posterior sustituye a la anterior).
+            monthly: nombres de las series mensuales, en el orden de xest.
+            quarterly: nombres de las series trimestrales, en el orden de xest.
+            date_col: columna de fecha de referencia.
+            vintage_col: columna de fecha de publicación.
+            series_col: columna con el nombre de la serie.
+            value_col: columna de valores.
+            dates: fechas del panel; por defecto, meses entre la primera y la última fecha de data.
+                   Las fechas de referencia y las del panel se llevan al primer día del mes;
+                   las publicaciones de meses fuera de dates se ignoran.
+        """
+        quarterly = list(quarterly) if quarterly is not None else []
+        self.series = list(monthly) + quarterly
+        self.nM = len(monthly)
+        # Fechas de referencia normalizadas al primer día del mes (p.ej. fechas de fin de mes)
+        ref = pd.to_datetime(data[date_col]).dt.to_period('M').dt.to_timestamp()
+        if dates is None:
+            dates = pd.date_range(ref.min(), ref.max(), freq='MS')
+        self.dates = pd.DatetimeIndex(dates).to_period('M').to_timestamp()
+
+        table = pd.DataFrame({
+            's': data[series_col].values,
+            't': self.dates.get_indexer(ref),
+            'v': pd.to_datetime(data[vintage_col]).values,
+            'x': data[value_col].values.astype(float)
+        })
+        table = table[table['t'] >= 0].sort_values(['s', 'v'], kind='stable')
+        self._vintages = {}
+        self._panels = {}
+        for name, rows in table.groupby('s', sort=False):
+            vint, v_idx = np.unique(rows['v'].values, return_inverse=True)
+            panel = np.full((len(vint), len(self.dates)), np.nan)
+            panel[v_idx, rows['t'].values] = rows['x'].values
+            # Cada publicación hereda los valores de las anteriores que no revisa
+            filled = pd.DataFrame(panel).ffill().values
+            self._vintages[name] = vint
+            self._panels[name] = filled
+
+    def asof(self, date_today) -> pd.DataFrame:
+        """
+        Panel conocido en date_today, con el formato de xest de common_load_data.
+
+        Args:
+            date_today: fecha de corte; se usan las publicaciones con vintage <= date_today.
+
+        Returns:
+            DataFrame indexado por fecha con series mensuales seguidas de trimestrales.
+        """
+        stamp = pd.Timestamp(date_today).to_datetime64()
+        values = np.full((len(self.dates), len(self.series)), np.nan)
+        for j, name in enumerate(self.series):
+            vint = self._vintages.get(name)
+            if vint is None:
+                continue
+            k = np.searchsorted(vint, stamp, side='right') - 1
+            if k >= 0:
+                values[:, j] = self._panels[name][k]
+        return pd.DataFrame(values, index=self.dates, columns=self.series)
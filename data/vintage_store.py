@@ -0,0 +1,173 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+class VintageStore:
+    """
+    Almacén en disco de vintages como cubo (vintage x serie x fecha de referencia).
+
+    Los valores se guardan como float64 en un archivo binario mapeado en
+    memoria, ordenado por vintage y, dentro de cada vintage, por serie: añadir
+    un vintage escribe solo sus bytes al final del archivo, sin reescribir los
+    anteriores; leer un vintage lee un bloque contiguo, y leer una serie lee
+    un tramo contiguo de fechas por vintage (no el resto de series). Las
+    fechas de referencia y las series se fijan al crear el almacén (reservar
+    fechas futuras si hace falta).
+
+    Attributes:
+        path: carpeta del almacén.
+        dates: DatetimeIndex de fechas de referencia.
+        series: Index de nombres de series.
+        vintages: DatetimeIndex de vintages almacenados (creciente).
+    """
+    DATA_FILE = 'cube.dat'
+    META_FILE = 'meta.json'
+
+    def __init__(self, path: str):
+        """
+        Abre un almacén existente.
+
+        Args:
+            path: carpeta creada con VintageStore.create.
+        """
+        self.path = path
+        with open(os.path.join(path, self.META_FILE)) as f:
+            meta = json.load(f)
+        self.dates = pd.DatetimeIndex(meta['dates'])
+        self.series = pd.Index(meta['series'], tupleize_cols=False)
+        self.vintages = pd.DatetimeIndex(meta['vintages'])
+
+    @classmethod
+    def create(cls, path: str, dates, series) -> 'VintageStore':
+        """
+        Crea un almacén vacío.
+
+        Args:
+            path: carpeta de destino (se crea si no existe).
+            dates: fechas de referencia del cubo.
+            series: nombres de las series.
+
+        Returns:
+            VintageStore vacío.
+        """
+        os.makedirs(path, exist_ok=True)
+        open(os.path.join(path, cls.DATA_FILE), 'wb').close()
+        cls._write_meta(path, pd.DatetimeIndex(dates), pd.Index(series), pd.DatetimeIndex([]))
+        return cls(path)
+
+    @classmethod
+    def from_long(cls, path: str, data: pd.DataFrame, date_col: str = 'date',
+                  vintage_col: str = 'vintage', series_col: str = 'series',
+                  value_col: str = 'value', dates=None) -> 'VintageStore':
+        """
+        Crea un almacén a partir de una tabla larga fecha/vintage/serie/valor.
+
+        Args:
+            path: carpeta de destino.
+            data: DataFrame en formato largo.
+            date_col: columna de fecha de referencia.
+            vintage_col: columna de fecha de publicación.
+            series_col: columna con el nombre de la serie.
+            value_col: columna de valores.
+            dates: fechas de referencia del cubo; por defecto las de data.
+
+        Returns:
+            VintageStore con un vintage por fecha de publicación distinta.
+        """
+        data = data.sort_values([vintage_col, date_col])
+        if dates is None:
+            dates = np.sort(pd.to_datetime(data[date_col]).unique())
+        store = cls.create(path, dates, pd.unique(data[series_col]))
+        for vintage, block in data.groupby(vintage_col, sort=True):
+            frame = block.pivot_table(index=date_col, columns=series_col, values=value_col,
+                                      aggfunc='last')
+            store.append(vintage, frame)
+        return store
+
+    @staticmethod
+    def _write_meta(path, dates, series, vintages) -> None:
+        """
+        Escribe los metadatos de forma atómica.
+        """
+        labels = [s.item() if isinstance(s, np.generic) else s for s in series]
+        if not all(isinstance(s, (str, int, float)) for s in labels):
+            raise ValueError("Los nombres de series deben ser str, int o float.")
+        meta = {
+            'dates': [d.isoformat() for d in dates],
+            'series': labels,
+            'vintages': [v.isoformat() for v in vintages],
+        }
+        tmp = os.path.join(path, VintageStore.META_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, VintageStore.META_FILE))
+
+    @property
+    def shape(self) -> tuple:
+        """(n_vintages, n_series, n_dates), disposición del archivo"""
+        return len(self.vintages), len(self.series), len(self.dates)
+
+    def _cube(self) -> np.memmap:
+        """
+        Vista mapeada en memoria de todo el cubo (solo lectura).
+        """
+        if len(self.vintages) == 0:
+            return np.empty(self.shape)
+        return np.memmap(os.path.join(self.path, self.DATA_FILE), dtype=np.float64,
+                         mode='r', shape=self.shape)
+
+    def append(self, vintage, frame: pd.DataFrame) -> None:
+        """
+        Añade un vintage al final del archivo.
+
+        Args:
+            vintage: fecha de publicación, posterior a la última almacenada.
+            frame: DataFrame indexado por fecha de referencia con columnas de series
+                   (subconjunto de las del almacén). Lo que falte queda como NaN.
+        """
+        vintage = pd.Timestamp(vintage)
+        if len(self.vintages) and vintage <= self.vintages[-1]:
+            raise ValueError(f"Vintage {vintage} no es posterior al último almacenado.")
+        frame = frame.copy()
+        frame.index = pd.DatetimeIndex(frame.index)
+        if not frame.index.isin(self.dates).all():
+            raise ValueError("frame contiene fechas de referencia fuera del almacén.")
+        if not frame.columns.isin(self.series).all():
+            raise ValueError("frame contiene series que no están en el almacén.")
+        block = frame.reindex(index=self.dates, columns=self.series).to_numpy(dtype=np.float64).T
+        # Escribir tras el último vintage registrado (descarta restos de una escritura interrumpida)
+        with open(os.path.join(self.path, self.DATA_FILE), 'r+b') as f:
+            f.seek(len(self.vintages) * block.nbytes)
+            f.write(np.ascontiguousarray(block).tobytes())
+            f.truncate()
+        self.vintages = self.vintages.append(pd.DatetimeIndex([vintage]))
+        self._write_meta(self.path, self.dates, self.series, self.vintages)
+
+    def vintage(self, vintage) -> pd.DataFrame:
+        """
+        Panel completo publicado en un vintage.
+
+        Args:
+            vintage: fecha de publicación almacenada.
+
+        Returns:
+            DataFrame fechas de referencia x series.
+        """
+        k = self.vintages.get_loc(pd.Timestamp(vintage))
+        return pd.DataFrame(np.array(self._cube()[k]).T, index=self.dates, columns=self.series)
+
+    def series_vintages(self, name: str) -> pd.DataFrame:
+        """
+        Historia de vintages de una serie, en el formato de align_vintages.
+
+        Args:
+            name: nombre de la serie.
+
+        Returns:
+            DataFrame con fechas de referencia como índice y vintages como columnas.
+        """
+        j = self.series.get_loc(name)
+        return pd.DataFrame(np.array(self._cube()[:, j, :]).T, index=self.dates,
+                            columns=self.vintages)
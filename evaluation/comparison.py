@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from scipy import stats
+
+
+def _losses(errors: pd.DataFrame, loss: str) -> pd.DataFrame:
+    """
+    Loss of each model on the dates where every model has a forecast error.
+    """
+    errors = errors.dropna()
+    if loss == 'squared':
+        return errors ** 2
+    if loss == 'absolute':
+        return errors.abs()
+    raise ValueError(f"Unknown loss {loss}.")
+
+
+def long_run_covariance(x: np.ndarray, lags: int) -> np.ndarray:
+    """
+    Newey-West (Bartlett kernel) long-run covariance of the columns of x.
+
+    Args:
+        x: array (T, M).
+        lags: number of autocovariances included.
+
+    Returns:
+        Array (M, M).
+    """
+    xc = x - x.mean(axis=0)
+    T = len(xc)
+    omega = xc.T @ xc / T
+    for l in range(1, lags + 1):
+        gamma = xc[l:].T @ xc[:-l] / T
+        omega += (1 - l / (lags + 1)) * (gamma + gamma.T)
+    return omega
+
+
+def diebold_mariano(errors: pd.DataFrame, h: int = 1, loss: str = 'squared') -> SimpleNamespace:
+    """
+    Diebold-Mariano tests of equal predictive accuracy for every pair of models.
+
+    The loss differential of models i and j has long-run variance
+    Omega_ii + Omega_jj - 2 Omega_ij, where Omega is the HAC covariance of
+    the loss vector, so one M x M covariance gives the variances of all
+    pairs at once. Statistics include the Harvey, Leybourne and Newbold
+    small-sample correction and are compared with a t(T-1) distribution.
+
+    Args:
+        errors: DataFrame (dates x models) of forecast errors; only dates
+                where every model has an error are used.
+        h: forecast horizon (h - 1 autocovariances in the HAC variance).
+        loss: 'squared' or 'absolute'.
+
+    Returns:
+        SimpleNamespace with:
+            stat: DataFrame (models x models); positive when the row model has
+                  the larger loss.
+            pvalue: DataFrame of two-sided p-values.
+            mean_loss: Series of average loss per model.
+    """
+    L = _losses(errors, loss)
+    x = L.to_numpy(dtype=float)
+    T = len(x)
+    mean = x.mean(axis=0)
+    omega = long_run_covariance(x, h - 1)
+    var = np.diag(omega)[:, None] + np.diag(omega)[None, :] - 2 * omega
+    correction = np.sqrt((T + 1 - 2 * h + h * (h - 1) / T) / T)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stat = correction * (mean[:, None] - mean[None, :]) / np.sqrt(var / T)
+    np.fill_diagonal(stat, np.nan)
+    pvalue = 2 * stats.t.sf(np.abs(stat), df=T - 1)
+    models = L.columns
+    return SimpleNamespace(stat=pd.DataFrame(stat, index=models, columns=models),
+                           pvalue=pd.DataFrame(pvalue, index=models, columns=models),
+                           mean_loss=pd.Series(mean, index=models))
+
+
+def model_confidence_set(errors: pd.DataFrame, alpha: float = 0.1, loss: str = 'squared',
+                         n_boot: int = 1000, block_length: int = 4, seed: int = 0) -> pd.DataFrame:
+    """
+    Model confidence set of Hansen, Lunde and Nason (2011) with the T_max statistic.
+
+    The moving-block bootstrap means of all models are drawn once, from
+    cumulative sums of the losses, as an (n_boot x models) array; each
+    elimination step then only recenters those means on the surviving
+    models, so the procedure costs a few array operations per step. The
+    elimination runs until one model is left so that every model gets its
+    MCS p-value; the set at level alpha is the models with p-value >= alpha.
+
+    Args:
+        errors: DataFrame (dates x models) of forecast errors; only dates
+                where every model has an error are used.
+        alpha: size of the test.
+        loss: 'squared' or 'absolute'.
+        n_boot: number of bootstrap replications.
+        block_length: length of the bootstrap blocks.
+        seed: seed of the bootstrap.
+
+    Returns:
+        DataFrame indexed by model with columns ['mean_loss', 'mcs_pvalue',
+        'included'], ordered from the last eliminated (best) model.
+    """
+    L = _losses(errors, loss)
+    x = L.to_numpy(dtype=float)
+    T, M = x.shape
+    block_length = min(block_length, T)
+    n_blocks = -(-T // block_length)
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, T - block_length + 1, size=(n_boot, n_blocks))
+    csum = np.vstack([np.zeros(M), np.cumsum(x, axis=0)])
+    block_sums = csum[block_length:] - csum[:-block_length]
+    boot = block_sums[starts].sum(axis=1) / (n_blocks * block_length)
+    mean = x.mean(axis=0)
+
+    alive = np.ones(M, dtype=bool)
+    pvalues = np.ones(M)
+    order = []
+    p_max = 0.0
+    while alive.sum() > 1:
+        idx = np.flatnonzero(alive)
+        d = mean[idx] - mean[idx].mean()
+        d_boot = boot[:, idx] - boot[:, idx].mean(axis=1, keepdims=True) - d
+        scale = np.sqrt((d_boot ** 2).mean(axis=0))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.where(scale > 0, d / scale, 0.0)
+            t_boot = np.where(scale > 0, d_boot / scale, 0.0).max(axis=1)
+        p_max = max(p_max, float((t_boot >= t.max()).mean()))
+        worst = idx[np.argmax(t)]
+        pvalues[worst] = p_max
+        alive[worst] = False
+        order.append(worst)
+    ranking = list(np.flatnonzero(alive)) + order[::-1]
+    out = pd.DataFrame({'mean_loss': mean, 'mcs_pvalue': pvalues}, index=L.columns).iloc[ranking]
+    out['included'] = out['mcs_pvalue'] >= alpha
+    return out
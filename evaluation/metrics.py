@@ -1,5 +1,8 @@
+import json
+import os
 import numpy as np
 import pandas as pd
+from types import SimpleNamespace
 
 
 def mean_squared_error(y_true: pd.Series, y_pred: pd.Series) -> float:
@@ -33,6 +36,9 @@ def theils_u(y_true: pd.Series, y_pred: pd.Series) -> float:
     return num / denom
 
 
+METRICS = ('MSE', 'RMSE', 'MAE', 'MAPE', 'Theil_U')
+
+
 def evaluate_forecasts(y_true: pd.DataFrame, y_pred: pd.DataFrame) -> pd.DataFrame:
     """
     Evalúa múltiples series de pronóstico.
@@ -44,16 +50,174 @@ def evaluate_forecasts(y_true: pd.DataFrame, y_pred: pd.DataFrame) -> pd.DataFra
     Returns:
         DataFrame con métricas para cada serie: ['MSE', 'RMSE', 'MAE', 'MAPE', 'Theil_U'].
     """
-    metrics = []
-    for col in y_true.columns:
-        true = y_true[col].dropna()
-        pred = y_pred[col].reindex_like(true)
-        metrics.append({
-            'series': col,
-            'MSE': mean_squared_error(true, pred),
-            'RMSE': root_mean_squared_error(true, pred),
-            'MAE': mean_absolute_error(true, pred),
-            'MAPE': mean_absolute_percentage_error(true, pred),
-            'Theil_U': theils_u(true, pred)
-        })
-    return pd.DataFrame(metrics).set_index('series')
+    pred = y_pred.reindex(index=y_true.index, columns=y_true.columns)
+    cube = metric_cube(y_true.values.T[None, None], pred.values.T[None, None],
+                       targets=list(y_true.columns))
+    out = cube.droplevel(['model', 'horizon'])[list(METRICS)]
+    out.index.name = 'series'
+    return out
+
+
+def metric_cube(y_true: np.ndarray, y_pred: np.ndarray, models: list = None,
+                horizons: list = None, targets: list = None) -> pd.DataFrame:
+    """
+    Every metric of this module for a (model x horizon x target x date) array in one pass.
+
+    Pairs where either value is missing are masked out; all sums are taken
+    over the date axis at once, and the MSE is computed once and reused for
+    the RMSE and Theil's U.
+
+    Args:
+        y_true: actuals, broadcastable to y_pred (e.g. (target, date) or
+                (horizon, target, date) when the outturn depends on the horizon).
+        y_pred: forecasts, array (model, horizon, target, date).
+        models, horizons, targets: labels of the first three axes (default: positions).
+
+    Returns:
+        DataFrame with a (model, horizon, target) MultiIndex and columns METRICS
+        plus 'n' (number of valid pairs).
+    """
+    y_pred = np.asarray(y_pred, dtype=float)
+    y_true = np.broadcast_to(np.asarray(y_true, dtype=float), y_pred.shape)
+    mask = np.isfinite(y_true) & np.isfinite(y_pred)
+    n = mask.sum(axis=-1)
+    err = np.where(mask, y_pred - y_true, 0.0)
+    true0, pred0 = np.where(mask, y_true, 0.0), np.where(mask, y_pred, 0.0)
+    nonzero = mask & (true0 != 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mse = (err ** 2).sum(axis=-1) / n
+        mae = np.abs(err).sum(axis=-1) / n
+        ape = np.where(nonzero, np.abs(err / np.where(nonzero, true0, 1.0)), 0.0)
+        mape = ape.sum(axis=-1) / nonzero.sum(axis=-1) * 100
+        denom = np.sqrt((pred0 ** 2).sum(axis=-1) / n) + np.sqrt((true0 ** 2).sum(axis=-1) / n)
+        theil = np.where(denom == 0, np.nan, np.sqrt(mse) / denom)
+    M, H, K = y_pred.shape[:3]
+    index = pd.MultiIndex.from_product([models if models is not None else range(M),
+                                        horizons if horizons is not None else range(H),
+                                        targets if targets is not None else range(K)],
+                                       names=['model', 'horizon', 'target'])
+    values = np.stack([mse, np.sqrt(mse), mae, mape, theil, n], axis=-1).reshape(M * H * K, -1)
+    out = pd.DataFrame(values, index=index, columns=list(METRICS) + ['n'])
+    out['n'] = out['n'].astype(int)
+    return out
+
+
+class ErrorAccumulator:
+    """
+    Running MAE, RMSE and forecast direction accuracy (FDA) by horizon and month of quarter.
+
+    One cell per (horizon, month of quarter) keeps the count, the sums of
+    absolute and squared errors and the number of correct directions, so
+    each new (forecast, outturn) pair is absorbed in O(1) and the state can
+    be saved and reloaded between runs instead of recomputing the errors
+    over the full history. The horizons follow the MAE namespace of main.py
+    ('Bac', 'Now', 'For').
+
+    The direction is the sign of the change with respect to `previous` when
+    given, otherwise the sign of the value itself (e.g. expansion or
+    contraction for GDP growth).
+    """
+    HORIZONS = ('Bac', 'Now', 'For')
+    ORDINALS = ('1st', '2nd', '3rd')
+    _FIELDS = ('n', 'sum_abs', 'sum_sq', 'n_dir', 'hits')
+
+    def __init__(self):
+        shape = (len(self.HORIZONS), len(self.ORDINALS))
+        self.n = np.zeros(shape, dtype=int)
+        self.sum_abs = np.zeros(shape)
+        self.sum_sq = np.zeros(shape)
+        self.n_dir = np.zeros(shape, dtype=int)
+        self.hits = np.zeros(shape, dtype=int)
+
+    def update(self, horizon: str, month: int, forecast: float, outturn: float,
+               previous: float = None) -> None:
+        """
+        Add one forecast error. Pairs with a missing value are ignored.
+
+        Args:
+            horizon: 'Bac', 'Now' or 'For'.
+            month: month of the quarter of the vintage (1, 2 or 3).
+            forecast: predicted value.
+            outturn: realized value.
+            previous: reference value for the direction (e.g. the previous quarter).
+        """
+        if forecast is None or outturn is None or np.isnan(forecast) or np.isnan(outturn):
+            return
+        cell = (self.HORIZONS.index(horizon), month - 1)
+        err = forecast - outturn
+        self.n[cell] += 1
+        self.sum_abs[cell] += abs(err)
+        self.sum_sq[cell] += err ** 2
+        ref = 0.0 if previous is None else previous
+        if not np.isnan(ref):
+            self.n_dir[cell] += 1
+            self.hits[cell] += int(np.sign(forecast - ref) == np.sign(outturn - ref))
+
+    def update_evaluation(self, rows: pd.DataFrame) -> None:
+        """
+        Add the rows of a pseudo-real-time evaluation (see eval_pseudo_real_time).
+
+        Args:
+            rows: DataFrame with 'month_in_quarter', 'backcast', 'nowcast',
+                  'forecast' and the matching 'outturn_back/now/fore' columns.
+        """
+        pairs = zip(self.HORIZONS, ('backcast', 'nowcast', 'forecast'), ('back', 'now', 'fore'))
+        for horizon, col, h in pairs:
+            for month, fcst, out in zip(rows['month_in_quarter'], rows[col], rows[f'outturn_{h}']):
+                self.update(horizon, int(month), fcst, out)
+
+    def _table(self, values: np.ndarray) -> pd.DataFrame:
+        """
+        Horizon x month-of-quarter table.
+        """
+        return pd.DataFrame(values, index=list(self.HORIZONS), columns=[1, 2, 3])
+
+    def mae(self) -> pd.DataFrame:
+        """Mean absolute error per cell (NaN if empty)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._table(self.sum_abs / self.n)
+
+    def rmse(self) -> pd.DataFrame:
+        """Root mean squared error per cell (NaN if empty)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._table(np.sqrt(self.sum_sq / self.n))
+
+    def fda(self) -> pd.DataFrame:
+        """Share of correct directions per cell (NaN if empty)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._table(self.hits / self.n_dir)
+
+    def to_namespace(self) -> SimpleNamespace:
+        """
+        Errors in the layout of the MAE namespace of main.py (MAE.Now.mae_1st, ...).
+        """
+        mae, fda = self.mae().values, self.fda().values
+        out = SimpleNamespace()
+        for i, horizon in enumerate(self.HORIZONS):
+            cell = SimpleNamespace()
+            for j, ordinal in enumerate(self.ORDINALS):
+                setattr(cell, f'mae_{ordinal}', float(mae[i, j]))
+                setattr(cell, f'fda_{ordinal}', float(fda[i, j]))
+            setattr(out, horizon, cell)
+        return out
+
+    def save(self, path: str) -> None:
+        """
+        Write the accumulator state to a JSON file (atomically).
+        """
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({name: getattr(self, name).tolist() for name in self._FIELDS}, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ErrorAccumulator':
+        """
+        Read an accumulator saved with save.
+        """
+        acc = cls()
+        with open(path) as f:
+            state = json.load(f)
+        for name in cls._FIELDS:
+            setattr(acc, name, np.asarray(state[name], dtype=getattr(acc, name).dtype))
+        return acc
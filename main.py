@@ -106,6 +106,7 @@ def main():
         min_bvar_lags=2,
         max_bvar_lags=4,
         do_random=True,
+        do_halving=False,    # successive halving over the evaluation window (True, or vintages of the first rung)
         list_name='Eval_list_DFM.xlsx',
         name_customloop='customloop',
         alter_covid=True
@@ -163,7 +164,7 @@ def main():
         # Res = {
         #     'DFM': lambda: DFM_estimate(xest_out, Par),
         #     'BEQ': lambda: BEQ_estimate(xest_out, Par, datet, nameseries, True, []),
-        #     'BVAR': lambda: BVAR_estimate(xest_out, Par, datet)
+        #     'BVAR': lambda: BVAR_estimate(xest_out, Par)
         # }[country.model]()
         print("Section 4: Estimation completed")
 
@@ -172,7 +173,8 @@ def main():
         # -----------------------------------------------------------------
         print("Section 5: News decomposition")
         # news_results, news_results_fcst, ... = {
-        #     'DFM': lambda: DFM_News_Mainfile(...),
+        #     'DFM': lambda: DFM_News_Mainfile(Res, xest_old, xest_out, nameseries[-1],
+        #                                      [nowcast_date, forecast_date], groups, groups_name),
         #     'BEQ': lambda: BEQ_News_Mainfile(...),
         #     'BVAR': lambda: BVAR_News_Mainfile(...)
         # }[country.model]()
@@ -182,7 +184,7 @@ def main():
         # -----------------------------------------------------------------
         if do_range:
             print("Section 6: Computing range of nowcasts")
-            # range_ = common_range(...)
+            # range_ = common_range(Res, xest_out, Par, [nowcast_date, forecast_date])
         else:
             range_ = None
             print("Section 6: Skipping range (do_range=False)")
@@ -1,5 +1,7 @@
 import numpy as np
 import pandas as pd
+from types import SimpleNamespace
+from scipy.linalg import cho_solve, solve_triangular
 from sklearn.linear_model import LinearRegression, Ridge
 
 
@@ -8,21 +10,33 @@ class BridgeRegression:
     Bridge regression model: fits a regression of a target series
     on a set of predictor series (e.g., factors from a DFM).
 
+    With recursive=True the Cholesky factor of the (penalized) normal
+    matrix of [1, X] is kept after fit, and rows added, removed or revised
+    across vintages are absorbed with rank-one updates and downdates, so
+    each re-estimation costs O(k^2) instead of a full refit.
+
     Attributes:
         model: sklearn regression model instance.
         method: 'ols' or 'ridge'.
         alpha: regularization strength for ridge.
+        recursive: keep the factorization for update/downdate/revise.
         features: feature column names.
         target: name of the target series.
+        n_obs: number of rows currently in the regression.
     """
     def __init__(self,
                  method: str = 'ols',
-                 alpha: float = 1.0):
+                 alpha: float = 1.0,
+                 recursive: bool = False):
         self.method = method.lower()
         self.alpha = alpha
+        self.recursive = recursive
         self.model = None
         self.features = None
         self.target = None
+        self.n_obs = 0
+        self._chol = None
+        self._xty = None
 
     def fit(self, X: pd.DataFrame, y: pd.Series) -> None:
         """
@@ -39,6 +53,69 @@ class BridgeRegression:
         else:
             self.model = LinearRegression()
         self.model.fit(X, y)
+        self.n_obs = len(X)
+        if self.recursive:
+            Z = self._with_intercept(X)
+            penalty = np.eye(Z.shape[1]) * (self.alpha if self.method == 'ridge' else 0.0)
+            penalty[0, 0] = 0.0
+            self._chol = np.linalg.cholesky(Z.T @ Z + penalty)
+            self._xty = Z.T @ np.asarray(y, dtype=float)
+
+    def update(self, X: pd.DataFrame, y: pd.Series) -> None:
+        """
+        Add rows (e.g. the observations of a new vintage) with rank-one updates.
+
+        Args:
+            X: DataFrame of predictors of the new rows.
+            y: Series of target of the new rows.
+        """
+        self._rank_one(X, y, 1.0)
+
+    def downdate(self, X: pd.DataFrame, y: pd.Series) -> None:
+        """
+        Remove rows (e.g. the oldest ones of a rolling window) with rank-one downdates.
+
+        Args:
+            X: DataFrame of predictors of the rows to remove, as they were added.
+            y: Series of target of the rows to remove, as they were added.
+        """
+        self._rank_one(X, y, -1.0)
+
+    def revise(self, X_old: pd.DataFrame, y_old: pd.Series,
+               X_new: pd.DataFrame, y_new: pd.Series) -> None:
+        """
+        Replace revised rows: downdate their old values and update the new ones.
+
+        Args:
+            X_old, y_old: rows as previously included.
+            X_new, y_new: revised rows.
+        """
+        self._rank_one(X_old, y_old, -1.0, refresh=False)
+        self._rank_one(X_new, y_new, 1.0)
+
+    def _with_intercept(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Regressors [1, X] in the column order of the fit.
+        """
+        values = X[self.features].to_numpy(dtype=float) if isinstance(X, pd.DataFrame) \
+            else np.asarray(X, dtype=float)
+        return np.hstack([np.ones((len(values), 1)), values])
+
+    def _rank_one(self, X, y, sign: float, refresh: bool = True) -> None:
+        """
+        Apply one rank-one update (sign=1) or downdate (sign=-1) per row.
+        """
+        if self._chol is None:
+            raise ValueError("Model must be fitted with recursive=True before updating.")
+        Z = self._with_intercept(X)
+        for z in Z:
+            _chol_rank_one(self._chol, z, sign)
+        self._xty += sign * (Z.T @ np.asarray(y, dtype=float))
+        self.n_obs += int(sign) * len(Z)
+        if refresh:
+            b = cho_solve((self._chol, True), self._xty)
+            self.model.intercept_ = b[0]
+            self.model.coef_ = b[1:]
 
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """
@@ -66,3 +143,247 @@ class BridgeRegression:
         print(f"Intercept: {intercept}")
         for feat, c in zip(self.features, coef):
             print(f"{feat}: {c}")
+
+
+def _chol_rank_one(L: np.ndarray, x: np.ndarray, sign: float) -> None:
+    """
+    In-place update of the lower Cholesky factor L of A to the factor of A + sign x x'.
+    """
+    x = x.copy()
+    for k in range(len(x)):
+        r2 = L[k, k] ** 2 + sign * x[k] ** 2
+        if r2 <= 0:
+            raise ValueError("Downdate makes the normal matrix singular.")
+        r = np.sqrt(r2)
+        c, s = r / L[k, k], x[k] / L[k, k]
+        L[k, k] = r
+        L[k + 1:, k] = (L[k + 1:, k] + sign * s * x[k + 1:]) / c
+        x[k + 1:] = c * x[k + 1:] - s * L[k + 1:, k]
+
+
+def fill_ragged_edge(xm: pd.DataFrame, until=None, p: int = 1) -> pd.DataFrame:
+    """
+    Fill the ragged edge of monthly indicators with auxiliary AR(p) forecasts.
+
+    The AR(p) models with intercept of all columns are estimated together
+    from stacked normal equations (each on its own observed rows), and the
+    forecasts are iterated over time for all columns at once, starting after
+    the last observation of each column. Gaps inside the sample are left
+    as they are.
+
+    Args:
+        xm: DataFrame of monthly series with a monthly DatetimeIndex.
+        until: last month to fill (e.g. the last month of the target quarter);
+               the index is extended if needed. Default: last row of xm.
+        p: order of the auxiliary AR models.
+
+    Returns:
+        DataFrame with the filled series.
+    """
+    index = xm.index
+    if until is not None and pd.Timestamp(until) > index[-1]:
+        index = index.append(pd.date_range(index[-1], pd.Timestamp(until), freq='MS')[1:])
+    x = xm.reindex(index).to_numpy(dtype=float, copy=True)
+    T, N = x.shape
+    # Stacked AR(p) regressions: D[t, n] = [1, x[t-1, n], ..., x[t-p, n]]
+    D = np.stack([np.ones((T - p, N))] + [x[p - l:T - l] for l in range(1, p + 1)], axis=2)
+    y = x[p:]
+    mask = np.isfinite(y) & np.isfinite(D).all(axis=2)
+    D0, y0 = np.where(mask[:, :, None], D, 0.0), np.where(mask, y, 0.0)
+    XtX = np.einsum('tni,tnj->nij', D0, D0)
+    Xty = np.einsum('tni,tn->ni', D0, y0)
+    coefs = np.einsum('nij,nj->ni', np.linalg.pinv(XtX), Xty)
+
+    observed = np.isfinite(x)
+    last = np.where(observed.any(axis=0), T - 1 - np.argmax(observed[::-1], axis=0), -1)
+    for t in range(max(last.min() + 1, p), T):
+        fill = t > last
+        pred = coefs[:, 0] + sum(coefs[:, l] * x[t - l] for l in range(1, p + 1))
+        x[t, fill] = pred[fill]
+    return pd.DataFrame(x, index=index, columns=xm.columns)
+
+
+def monthly_to_quarterly(xm: pd.DataFrame) -> pd.DataFrame:
+    """
+    Quarterly averages of monthly series in one reshape.
+
+    Args:
+        xm: DataFrame of monthly series with a monthly DatetimeIndex.
+
+    Returns:
+        DataFrame indexed by the last month of each quarter; NaN where any
+        month of the quarter is missing (incomplete first/last quarters included).
+    """
+    start = pd.Timestamp(xm.index[0].year, 3 * ((xm.index[0].month - 1) // 3) + 1, 1)
+    end = pd.Timestamp(xm.index[-1].year, 3 * ((xm.index[-1].month - 1) // 3) + 3, 1)
+    months = pd.date_range(start, end, freq='MS')
+    x = xm.reindex(months).to_numpy(dtype=float)
+    quarterly = x.reshape(-1, 3, x.shape[1]).mean(axis=1)
+    return pd.DataFrame(quarterly, index=months[2::3], columns=xm.columns)
+
+
+def bridge_data(xest: pd.DataFrame, nM: int, until=None, p: int = 1) -> pd.DataFrame:
+    """
+    Quarterly panel for bridge equations from xest.
+
+    The monthly indicators are filled to `until` with fill_ragged_edge and
+    averaged by quarter; the quarterly series of xest (stored in the last
+    month of each quarter) are appended.
+
+    Args:
+        xest: DataFrame with monthly series first and quarterly series last.
+        nM: number of monthly series.
+        until: last month to fill (e.g. the last month of the target quarter).
+        p: order of the auxiliary AR models.
+
+    Returns:
+        DataFrame indexed by the last month of each quarter.
+    """
+    quarterly = monthly_to_quarterly(fill_ragged_edge(xest.iloc[:, :nM], until, p))
+    return quarterly.join(xest.iloc[:, nM:], how='left')
+
+
+def lagged_design(data: pd.DataFrame, columns: list, max_lag: int, min_lag: int = 0) -> pd.DataFrame:
+    """
+    Lags min_lag..max_lag of the given columns, named '<column>_L<lag>'.
+
+    Args:
+        data: DataFrame of quarterly series (indicators and target).
+        columns: columns to lag.
+        max_lag: largest lag.
+        min_lag: smallest lag (1 for the own lags of the target).
+
+    Returns:
+        DataFrame with one column per (column, lag), ordered lag-major.
+    """
+    return pd.concat({f"{c}_L{l}": data[c].shift(l) for l in range(min_lag, max_lag + 1)
+                      for c in columns}, axis=1)
+
+
+def bridge_specs(indicator_sets: list, lags_x, lags_y, target: str) -> list:
+    """
+    Column lists of a grid of bridge equations over indicator subsets and lags.
+
+    Columns are ordered own lags of the target first and then the indicators
+    lag by lag, so equations differing only in the indicator lag are nested
+    (prefixes of each other) and share a factorization in BatchBridgeRegression.
+
+    Args:
+        indicator_sets: list of lists of indicator names.
+        lags_x: iterable of indicator lag orders (lag 0 is always included).
+        lags_y: iterable of own-lag orders of the target (0 for none).
+        target: name of the target series.
+
+    Returns:
+        List of column lists, using the names of lagged_design.
+    """
+    specs = []
+    for indicators in indicator_sets:
+        for ly in lags_y:
+            own = [f"{target}_L{l}" for l in range(1, ly + 1)]
+            for lx in lags_x:
+                specs.append(own + [f"{c}_L{l}" for l in range(lx + 1) for c in indicators])
+    return specs
+
+
+class BatchBridgeRegression:
+    """
+    Bridge regressions for a whole grid of specifications solved together.
+
+    Specifications whose columns are a prefix of a longer one share its QR
+    factorization: with X = QR and the rotated target Q'y, the first j
+    columns give b = R[:j, :j]^-1 (Q'y)[:j] and RSS = ||y||^2 - ||(Q'y)[:j]||^2.
+    Each chain is estimated on the rows where its longest design and the
+    target are observed. The ridge option appends sqrt(alpha) rows for the
+    slopes, which keeps the nesting (the intercept is not penalized).
+
+    Attributes:
+        method: 'ols' or 'ridge'.
+        alpha: regularization strength for ridge.
+        specs: list of column lists.
+        results: SimpleNamespace with stacked estimates (see fit).
+    """
+    def __init__(self, method: str = 'ols', alpha: float = 1.0):
+        self.method = method.lower()
+        self.alpha = alpha
+        self.specs = None
+        self.results = None
+
+    def fit(self, X: pd.DataFrame, y: pd.Series, specs: list) -> SimpleNamespace:
+        """
+        Fit every specification.
+
+        Args:
+            X: DataFrame with all candidate regressors (e.g. from lagged_design).
+            y: Series of the target, aligned with X.
+            specs: list of column lists; an intercept is always added.
+
+        Returns:
+            SimpleNamespace with:
+                coefs: (n_specs, 1 + max columns) intercept and slopes, NaN-padded.
+                fitted: (n_specs, T) in-sample fitted values (NaN outside the sample).
+                resid: (n_specs, T) in-sample errors.
+                rmse: (n_specs,) in-sample root mean squared error.
+                n_obs: (n_specs,) number of observations used.
+        """
+        self.specs = [list(spec) for spec in specs]
+        n_specs, T = len(self.specs), len(X)
+        width = 1 + max((len(spec) for spec in self.specs), default=0)
+        coefs = np.full((n_specs, width), np.nan)
+        fitted = np.full((n_specs, T), np.nan)
+        rmse = np.full(n_specs, np.nan)
+        n_obs = np.zeros(n_specs, dtype=int)
+        yv = y.to_numpy(dtype=float)
+
+        for root, members in self._chains().items():
+            design = np.hstack([np.ones((T, 1)), X[list(root)].to_numpy(dtype=float)])
+            rows = np.isfinite(design).all(axis=1) & np.isfinite(yv)
+            D, target = design[rows], yv[rows]
+            if self.method == 'ridge':
+                penalty = np.sqrt(self.alpha) * np.eye(D.shape[1])[1:]
+                D, target = np.vstack([D, penalty]), np.concatenate([target, np.zeros(len(penalty))])
+            Q, R = np.linalg.qr(D)
+            qty = Q.T @ target
+            for i in members:
+                j = 1 + len(self.specs[i])
+                b = solve_triangular(R[:j, :j], qty[:j])
+                fit_i = design[rows, :j] @ b
+                coefs[i, :j] = b
+                fitted[i, rows] = fit_i
+                n_obs[i] = rows.sum()
+                rmse[i] = np.sqrt(np.mean((yv[rows] - fit_i) ** 2)) if n_obs[i] else np.nan
+        self.results = SimpleNamespace(coefs=coefs, fitted=fitted, resid=yv[None, :] - fitted,
+                                       rmse=rmse, n_obs=n_obs)
+        return self.results
+
+    def _chains(self) -> dict:
+        """
+        Group specifications by the longest specification they are a prefix of.
+
+        Returns:
+            Dict root column tuple -> list of spec positions.
+        """
+        chains = {}
+        for i in sorted(range(len(self.specs)), key=lambda i: -len(self.specs[i])):
+            spec = tuple(self.specs[i])
+            root = next((r for r in chains if r[:len(spec)] == spec), spec)
+            chains.setdefault(root, []).append(i)
+        return chains
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Predictions of every specification.
+
+        Args:
+            X: DataFrame with the regressors of the specifications.
+
+        Returns:
+            Array (n_specs, len(X)).
+        """
+        if self.results is None:
+            raise ValueError("Model must be fitted before prediction.")
+        out = np.empty((len(self.specs), len(X)))
+        for i, spec in enumerate(self.specs):
+            b = self.results.coefs[i, :1 + len(spec)]
+            out[i] = b[0] + X[spec].to_numpy(dtype=float) @ b[1:]
+        return out
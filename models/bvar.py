@@ -1,59 +1,86 @@
 import numpy as np
 import pandas as pd
+from types import SimpleNamespace
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
+from scipy.optimize import minimize_scalar
+from scipy.special import multigammaln
 from statsmodels.tsa.api import VAR
-from sklearn.linear_model import Ridge
+
+from nowcasting_toolbox_py.models.kalman import kalman_filter, kalman_smoother
 
 
 class BayesianVARModel:
     """
-    Bayesian VAR model wrapper. Uses statsmodels VAR for OLS estimation
-    with optional ridge regularization as a Bayesian shrinkage analogue.
+    Bayesian VAR model wrapper. By default the conjugate normal-inverse-Wishart
+    prior with Minnesota moments (method='minnesota'); statsmodels VAR for OLS
+    estimation (method='ols') and ridge regularization of the lag coefficients
+    as a Bayesian shrinkage analogue (method='ridge') are also available.
 
     Attributes:
         endog: pandas DataFrame of endogenous variables.
         lags: number of lags.
-        use_ridge: whether to apply ridge regularization.
+        use_ridge: whether to apply ridge regularization (method='ridge' when method is None).
         alpha: ridge penalty parameter.
-        model: statsmodels VAR instance.
-        results: fitted results or custom coefficients.
+        method: 'minnesota' (default), 'ols' or 'ridge'.
+        lambda1: overall tightness of the Minnesota prior.
+        lambda3: lag decay of the Minnesota prior.
+        lambda_const: prior scale of the intercepts (relative to the residual variance).
+        delta: prior mean of the own first lag (scalar or one value per series).
+        model: statsmodels VAR instance (method='ols').
+        results: statsmodels VARResults (method='ols') or SimpleNamespace with
+                 intercept, coefs and sigma_u (method='minnesota' or 'ridge').
     """
     def __init__(self,
                  endog: pd.DataFrame,
                  lags: int = 1,
                  use_ridge: bool = False,
-                 alpha: float = 1.0):
+                 alpha: float = 1.0,
+                 method: str = None,
+                 lambda1: float = 0.2,
+                 lambda3: float = 1.0,
+                 lambda_const: float = 100.0,
+                 delta=0.0):
         self.endog = endog
         self.lags = lags
-        self.use_ridge = use_ridge
+        self.method = method or ('ridge' if use_ridge else 'minnesota')
+        if self.method not in ('ols', 'ridge', 'minnesota'):
+            raise ValueError(f"Unknown method {self.method}.")
+        self.use_ridge = self.method == 'ridge'
         self.alpha = alpha
+        self.lambda1 = lambda1
+        self.lambda3 = lambda3
+        self.lambda_const = lambda_const
+        self.delta = delta
         self.model = None
         self.results = None
+        self._moments = None
 
-    def fit(self, **fit_kwargs) -> None:
+    def fit(self, optimize: bool = False, thresh: float = 1e-6, max_iter: int = 200,
+            **fit_kwargs) -> None:
         """
-        Fit the VAR model. If use_ridge is False, use statsmodels VAR.
-        Otherwise, fit each equation with Ridge regression.
+        Fit the VAR model. With method='minnesota' the posterior of all
+        equations is computed in closed form (see posterior); with 'ols'
+        statsmodels VAR is used; with 'ridge' all equations are solved at once
+        from the cached cross-products (see ridge).
 
         Args:
+            optimize: (minnesota) choose lambda1 by maximizing the marginal likelihood.
+            thresh: (minnesota) tolerance on log(lambda1) of the optimization.
+            max_iter: (minnesota) maximum number of iterations of the optimization.
             **fit_kwargs: passed to statsmodels VAR.fit().
         """
-        if not self.use_ridge:
+        if self.method == 'minnesota':
+            self._moments = self._sample_moments()
+            if optimize:
+                self.optimize_lambda(thresh=thresh, max_iter=max_iter)
+            else:
+                self.results = self.posterior()
+        elif not self.use_ridge:
             self.model = VAR(self.endog)
             self.results = self.model.fit(self.lags, **fit_kwargs)
         else:
-            # Prepare lagged design matrix
-            data = self.endog
-            lagged = self.model = VAR(data).fit(maxlags=self.lags).prepare_data(
-                dynamic=False)
-            # X: lagged exog, y: current values
-            X = lagged[0]
-            y = lagged[1]
-            coefs = {}
-            for i, col in enumerate(data.columns):
-                ridge = Ridge(alpha=self.alpha)
-                ridge.fit(X, y[:, i])
-                coefs[col] = ridge.coef_
-            self.results = coefs
+            self._moments = self._sample_moments()
+            self.results = self.ridge()
 
     def nowcast(self, steps: int = 1) -> pd.DataFrame:
         """
@@ -67,11 +94,361 @@ class BayesianVARModel:
         """
         if self.results is None:
             raise ValueError("Model must be fitted before forecasting.")
-        if not self.use_ridge:
+        if self.method == 'ols':
             return self.results.forecast(self.endog.values[-self.lags:], steps)
-        else:
-            # Ridge-based manual forecasting not implemented
-            raise NotImplementedError("Forecasting with ridge prior not implemented.")
+        history = self.endog.values[-self.lags:].astype(float)
+        if np.isnan(history).any():
+            raise ValueError("Last rows of endog are incomplete; use update() for the ragged edge.")
+        return self._iterate_forecast(history, steps)
+
+    def _var_matrices(self):
+        """
+        Intercept (k,), lag coefficients (p, k, k) and residual covariance (k, k)
+        of the fitted VAR.
+        """
+        return (np.asarray(self.results.intercept), np.asarray(self.results.coefs),
+                np.asarray(self.results.sigma_u))
+
+    def _iterate_forecast(self, history: np.ndarray, steps: int) -> np.ndarray:
+        """
+        Iterated forecasts (steps, k) from the last p rows of data (oldest first).
+        """
+        intercept, coefs, _ = self._var_matrices()
+        p = coefs.shape[0]
+        path = list(history[-p:])
+        out = np.empty((steps, len(intercept)))
+        for h in range(steps):
+            out[h] = intercept + sum(coefs[l] @ path[-1 - l] for l in range(p))
+            path.append(out[h])
+        return out
+
+    def _sample_moments(self, max_lags: int = None) -> SimpleNamespace:
+        """
+        Cross-products of the lagged design and the prior scales, computed once per sample.
+
+        The design is built for max_lags (default: self.lags) with columns
+        [1, y_{t-1}, ..., y_{t-max_lags}], so the blocks of any smaller lag
+        order p are the leading 1 + k p rows/columns. Rows whose lag window
+        contains a missing value are dropped.
+        """
+        y = self.endog.values.astype(float)
+        p, k = max_lags or self.lags, y.shape[1]
+        Y = y[p:]
+        X = np.hstack([np.ones((len(Y), 1))] + [y[p - l:len(y) - l] for l in range(1, p + 1)])
+        keep = np.isfinite(X).all(axis=1) & np.isfinite(Y).all(axis=1)
+        X, Y = X[keep], Y[keep]
+        if len(Y) <= k * p + 1:
+            raise ValueError("Not enough complete observations to estimate the BVAR.")
+        # Residual variance of an AR(1) per series, the usual Minnesota scale
+        y0, y1 = Y - Y.mean(axis=0), X[:, 1:k + 1] - X[:, 1:k + 1].mean(axis=0)
+        rho = (y0 * y1).sum(axis=0) / (y1 ** 2).sum(axis=0)
+        sigma2 = ((y0 - rho * y1) ** 2).sum(axis=0) / (len(Y) - 2)
+        return SimpleNamespace(XtX=X.T @ X, XtY=X.T @ Y, YtY=Y.T @ Y, T=len(Y), k=k,
+                               sigma2=sigma2, max_lags=p)
+
+    def _moments_for(self, lags: int) -> SimpleNamespace:
+        """
+        Cached cross-products, rebuilt only if they do not cover `lags`.
+        """
+        if self._moments is None or self._moments.max_lags < lags:
+            self._moments = self._sample_moments(lags)
+        return self._moments
+
+    def _prior(self, lambda1: float, lags: int):
+        """
+        Prior mean B0, diagonal of Omega0, scale S0 and degrees of freedom nu0.
+        """
+        mom = self._moments
+        p, k = lags, mom.k
+        lag_scale = np.repeat(np.arange(1, p + 1) ** (2.0 * self.lambda3), k)
+        omega = np.concatenate([[self.lambda_const ** 2],
+                                lambda1 ** 2 / (lag_scale * np.tile(mom.sigma2, p))])
+        B0 = np.zeros((1 + k * p, k))
+        B0[1:k + 1] = np.diag(np.broadcast_to(np.asarray(self.delta, dtype=float), (k,)))
+        nu0 = k + 2
+        S0 = np.diag(mom.sigma2) * (nu0 - k - 1)
+        return B0, omega, S0, nu0
+
+    def posterior(self, lambda1: float = None, lags: int = None) -> SimpleNamespace:
+        """
+        Normal-inverse-Wishart posterior for all equations in one solve.
+
+        With B | Sigma ~ MN(B0, Omega0, Sigma) and Sigma ~ IW(S0, nu0):
+        Omega_post = (Omega0^-1 + X'X)^-1, B_post = Omega_post (Omega0^-1 B0 + X'Y),
+        S_post = S0 + Y'Y + B0' Omega0^-1 B0 - B_post' Omega_post^-1 B_post and
+        nu_post = nu0 + T. Only the cached cross-products enter, so a new
+        lambda1 costs one Cholesky factorization of size (1 + k p). A lag
+        order below the one of the cached blocks uses their leading submatrices.
+
+        Args:
+            lambda1: overall tightness (default: self.lambda1).
+            lags: lag order (default: self.lags).
+
+        Returns:
+            SimpleNamespace with intercept (k,), coefs (p, k, k), sigma_u (posterior
+            mean of Sigma), B, Omega_chol, S, nu, lambda1 and log_ml.
+        """
+        p = self.lags if lags is None else lags
+        mom = self._moments_for(p)
+        lambda1 = self.lambda1 if lambda1 is None else lambda1
+        k, n = mom.k, 1 + mom.k * p
+        B0, omega, S0, nu0 = self._prior(lambda1, p)
+        XtY = mom.XtY[:n]
+        P = mom.XtX[:n, :n] + np.diag(1.0 / omega)
+        chol = cho_factor(P, lower=True)
+        rhs = B0 / omega[:, None]
+        B = cho_solve(chol, rhs + XtY)
+        S = S0 + mom.YtY + B0.T @ rhs - B.T @ P @ B
+        S = (S + S.T) / 2
+        nu = nu0 + mom.T
+        logdet_P = 2 * np.log(np.diag(chol[0])).sum()
+        log_ml = (-mom.T * k / 2 * np.log(np.pi) + multigammaln(nu / 2, k) - multigammaln(nu0 / 2, k)
+                  - k / 2 * (np.log(omega).sum() + logdet_P)
+                  + nu0 / 2 * np.linalg.slogdet(S0)[1] - nu / 2 * np.linalg.slogdet(S)[1])
+        coefs = B[1:].reshape(p, k, k).transpose(0, 2, 1)
+        return SimpleNamespace(intercept=B[0], coefs=coefs, sigma_u=S / (nu - k - 1), B=B,
+                               Omega_chol=chol, S=S, nu=nu, lambda1=lambda1, log_ml=log_ml)
+
+    def ridge(self, alpha: float = None) -> SimpleNamespace:
+        """
+        Ridge estimate of all equations from the cached cross-products.
+
+        B = (X'X + alpha D)^-1 X'Y with D the identity except for a zero on
+        the intercept, which is not penalized (as in sklearn Ridge).
+
+        Args:
+            alpha: ridge penalty (default: self.alpha).
+
+        Returns:
+            SimpleNamespace with intercept (k,), coefs (p, k, k), sigma_u (residual
+            covariance with T - (1 + k p) degrees of freedom), B and alpha.
+        """
+        p = self.lags
+        mom = self._moments_for(p)
+        alpha = self.alpha if alpha is None else alpha
+        k, n = mom.k, 1 + mom.k * p
+        XtX, XtY = mom.XtX[:n, :n], mom.XtY[:n]
+        penalty = np.full(n, alpha)
+        penalty[0] = 0.0
+        B = np.linalg.solve(XtX + np.diag(penalty), XtY)
+        resid = mom.YtY - B.T @ XtY - XtY.T @ B + B.T @ XtX @ B
+        sigma_u = (resid + resid.T) / 2 / max(mom.T - n, 1)
+        coefs = B[1:].reshape(p, k, k).transpose(0, 2, 1)
+        return SimpleNamespace(intercept=B[0], coefs=coefs, sigma_u=sigma_u, B=B, alpha=alpha)
+
+    def optimize_lambda(self, thresh: float = 1e-6, max_iter: int = 200,
+                        bounds: tuple = (1e-3, 10.0)) -> float:
+        """
+        Set lambda1 to the maximizer of the marginal likelihood and refit.
+
+        Args:
+            thresh: tolerance on log(lambda1).
+            max_iter: maximum number of iterations.
+            bounds: search interval for lambda1.
+
+        Returns:
+            Selected lambda1.
+        """
+        self.lambda1 = self._best_lambda(self.lags, thresh, max_iter, bounds)
+        self.results = self.posterior()
+        return self.lambda1
+
+    def _best_lambda(self, lags: int, thresh: float, max_iter: int, bounds: tuple) -> float:
+        """
+        lambda1 maximizing the marginal likelihood for a given lag order.
+        """
+        opt = minimize_scalar(lambda z: -self.posterior(np.exp(z), lags).log_ml,
+                              bounds=np.log(bounds), method='bounded',
+                              options={'xatol': thresh, 'maxiter': max_iter})
+        return float(np.exp(opt.x))
+
+    def select_lags(self, max_lags: int, min_lags: int = 1, criterion: str = 'log_ml',
+                    optimize: bool = False, thresh: float = 1e-6, max_iter: int = 200,
+                    bounds: tuple = (1e-3, 10.0)) -> pd.DataFrame:
+        """
+        Choose the lag order from one set of cross-products (method='minnesota').
+
+        X'X, X'Y and Y'Y are built once for max_lags; every smaller order is
+        evaluated on the same sample from their leading blocks, so the whole
+        search costs about one fit. The selected order and its posterior are
+        stored in self.lags and self.results.
+
+        Args:
+            max_lags: largest lag order.
+            min_lags: smallest lag order.
+            criterion: 'log_ml' (maximized) or 'aic', 'bic', 'hqic' (minimized).
+            optimize: choose lambda1 by marginal likelihood for every order.
+            thresh: tolerance on log(lambda1) of the optimization.
+            max_iter: maximum number of iterations of the optimization.
+            bounds: search interval for lambda1.
+
+        Returns:
+            DataFrame indexed by lag order with columns ['lambda1', 'log_ml',
+            'aic', 'bic', 'hqic'] (information criteria of the OLS fit).
+        """
+        if self.method != 'minnesota':
+            raise NotImplementedError("Lag selection requires method='minnesota'.")
+        if criterion not in ('log_ml', 'aic', 'bic', 'hqic'):
+            raise ValueError(f"Unknown criterion {criterion}.")
+        self._moments = self._sample_moments(max_lags)
+        mom = self._moments
+        k, T = mom.k, mom.T
+        rows = []
+        for p in range(min_lags, max_lags + 1):
+            lambda1 = self._best_lambda(p, thresh, max_iter, bounds) if optimize else self.lambda1
+            n = 1 + k * p
+            B_ols = np.linalg.solve(mom.XtX[:n, :n], mom.XtY[:n])
+            sigma = (mom.YtY - mom.XtY[:n].T @ B_ols) / T
+            logdet = np.linalg.slogdet(sigma)[1]
+            free = k * n
+            rows.append({'lags': p, 'lambda1': lambda1,
+                         'log_ml': self.posterior(lambda1, p).log_ml,
+                         'aic': logdet + 2 * free / T,
+                         'bic': logdet + np.log(T) * free / T,
+                         'hqic': logdet + 2 * np.log(np.log(T)) * free / T})
+        table = pd.DataFrame(rows).set_index('lags')
+        best = table[criterion].idxmax() if criterion == 'log_ml' else table[criterion].idxmin()
+        self.lags = int(best)
+        self.lambda1 = float(table.loc[best, 'lambda1'])
+        self.results = self.posterior()
+        return table
+
+    def update(self, new_obs: pd.DataFrame, steps: int = 1) -> pd.DataFrame:
+        """
+        Incorporate new data releases keeping the estimated coefficients fixed.
+
+        The VAR is written in companion state-space form and only the ragged
+        edge (the rows after the last p consecutive complete observations) plus `steps`
+        periods ahead are filtered and smoothed, so missing values of the
+        latest periods are nowcast conditionally on whatever has been released.
+
+        Args:
+            new_obs: DataFrame of new or revised observations with columns among
+                     those of endog. Dates beyond the end of endog are appended.
+            steps: number of periods to forecast after the last row of endog.
+
+        Returns:
+            DataFrame with the nowcast of the ragged-edge rows followed by the
+            `steps` forecasts.
+        """
+        if self.results is None:
+            raise ValueError("Model must be fitted before updating.")
+        if not new_obs.columns.isin(self.endog.columns).all():
+            raise ValueError("new_obs contains series that are not in the model.")
+        endog = self.endog.reindex(self.endog.index.union(new_obs.index))
+        endog.update(new_obs)
+        self.endog = endog
+
+        intercept, coefs, sigma = self._var_matrices()
+        p, k = coefs.shape[0], coefs.shape[1]
+        # Condition on the last p consecutive complete rows
+        complete = endog.notna().all(axis=1).values.astype(int)
+        windows = np.flatnonzero(np.convolve(complete, np.ones(p, dtype=int), 'valid') == p)
+        if len(windows) == 0:
+            raise ValueError(f"No {p} consecutive complete observations to condition on.")
+        t_b = windows[-1] + p - 1
+        y = np.vstack([endog.values[t_b + 1:].astype(float), np.full((steps, k), np.nan)])
+        if len(y) == 0:
+            # Complete panel and no horizon: nothing to filter
+            return pd.DataFrame(np.empty((0, k)), index=endog.index[:0], columns=endog.columns)
+
+        # Companion form in deviations from the unconditional mean
+        mu = np.linalg.solve(np.eye(k) - coefs.sum(axis=0), intercept)
+        A = np.zeros((k * p, k * p))
+        A[:k] = np.hstack(coefs)
+        A[k:, :-k] = np.eye(k * (p - 1))
+        Q = np.zeros((k * p, k * p))
+        Q[:k, :k] = sigma
+        C = np.zeros((k, k * p))
+        C[:, :k] = np.eye(k)
+        history = endog.values[t_b - p + 1:t_b + 1][::-1].astype(float) - mu
+        Z0 = A @ history.ravel()
+        filt = kalman_filter(y - mu, C, np.full(k, 1e-10), A, Q, Z0, Q.copy())
+        states = kalman_smoother(A, filt).Zs[:, :k] + mu
+
+        index = endog.index[t_b + 1:]
+        if steps:
+            index = index.append(self._future_index(steps))
+        return pd.DataFrame(states, index=index, columns=endog.columns)
+
+    def _future_index(self, steps: int) -> pd.Index:
+        """
+        Index of the `steps` periods after the last row of endog.
+        """
+        index = self.endog.index
+        freq = pd.infer_freq(index) if isinstance(index, pd.DatetimeIndex) and len(index) > 2 else None
+        if freq is not None:
+            return pd.date_range(index[-1], periods=steps + 1, freq=freq)[1:]
+        return pd.RangeIndex(len(index), len(index) + steps)
+
+    def sample_forecast(self, steps: int = 1, n_draws: int = 1000,
+                        quantiles=(0.05, 0.16, 0.5, 0.84, 0.95), seed=None,
+                        batch_size: int = 500, sketch_size: int = 1000) -> pd.DataFrame:
+        """
+        Quantiles of the predictive density from posterior draws (method='minnesota').
+
+        Each batch draws Sigma from the inverse-Wishart posterior (Bartlett
+        decomposition), B | Sigma from the matrix-normal posterior and one
+        forecast path per draw, all as stacked array operations; the loop
+        runs over batches and forecast steps, not over draws. Each finished
+        batch is reduced to a quantile sketch of `sketch_size` points per
+        series and step and merged into the running sketch, so memory is
+        bounded by batch_size + 2 * sketch_size paths whatever n_draws. The
+        quantiles are therefore approximate: each merge moves ranks by at most
+        about 1 / (2 * sketch_size), negligible against the Monte Carlo error
+        when sketch_size is of the order of batch_size.
+
+        Args:
+            steps: number of periods to forecast after the last row of endog.
+            n_draws: number of posterior draws.
+            quantiles: quantiles to return.
+            seed: int or np.random.SeedSequence. Each batch uses its own child
+                  stream, so results are reproducible for a given seed and
+                  batch_size; for parallel runs pass children of one SeedSequence.
+            batch_size: number of draws simulated at once.
+            sketch_size: number of points of the quantile sketch.
+
+        Returns:
+            DataFrame indexed by forecast date with (series, quantile) columns.
+        """
+        if self.results is None:
+            raise ValueError("Model must be fitted before sampling.")
+        if self.method != 'minnesota':
+            raise NotImplementedError("Posterior sampling requires method='minnesota'.")
+        res = self.results
+        p, k = self.lags, len(res.intercept)
+        history = self.endog.values[-p:].astype(float)
+        if np.isnan(history).any():
+            raise ValueError("Last rows of endog are incomplete; use update() for the ragged edge.")
+
+        # Factors: F F' = Omega_post and L_S L_S' = S_post^-1
+        F = solve_triangular(res.Omega_chol[0], np.eye(len(res.B)), lower=True).T
+        L_S = np.linalg.cholesky(np.linalg.inv(res.S))
+        rows, cols = np.tril_indices(k, -1)
+        seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        sizes = [min(batch_size, n_draws - i) for i in range(0, n_draws, batch_size)]
+        sketch = None
+        for n, child in zip(sizes, seed.spawn(len(sizes))):
+            rng = np.random.default_rng(child)
+            # Sigma^-1 = (L_S A)(L_S A)' ~ Wishart(S^-1, nu), so G = (L_S A)^-T gives G G' = Sigma
+            A = np.zeros((n, k, k))
+            A[:, np.arange(k), np.arange(k)] = np.sqrt(rng.chisquare(res.nu - np.arange(k), size=(n, k)))
+            A[:, rows, cols] = rng.standard_normal((n, len(rows)))
+            G = np.linalg.inv(L_S @ A).transpose(0, 2, 1)
+            B = res.B + (F @ rng.standard_normal((n, len(res.B), k))) @ G.transpose(0, 2, 1)
+            shocks = rng.standard_normal((n, steps, k)) @ G.transpose(0, 2, 1)
+            lags = np.repeat(history[::-1].reshape(1, -1), n, axis=0)
+            path = np.empty((n, steps, k))
+            for h in range(steps):
+                X = np.hstack([np.ones((n, 1)), lags])
+                path[:, h] = np.einsum('nm,nmk->nk', X, B) + shocks[:, h]
+                lags = np.hstack([path[:, h], lags[:, :-k]])
+            sketch = _merge_sketches(sketch, (_sketch_points(path, sketch_size), n), sketch_size)
+        q = _sketch_quantiles(sketch[0], quantiles)
+        columns = pd.MultiIndex.from_product([self.endog.columns, list(quantiles)],
+                                             names=['series', 'quantile'])
+        return pd.DataFrame(q.transpose(1, 2, 0).reshape(steps, -1), index=self._future_index(steps),
+                            columns=columns)
 
     def summary(self) -> None:
         """
@@ -79,9 +456,56 @@ class BayesianVARModel:
         """
         if self.results is None:
             raise ValueError("Model must be fitted before summarizing.")
-        if not self.use_ridge:
+        if self.method == 'minnesota':
+            print(f"Minnesota BVAR({self.lags}), lambda1={self.results.lambda1:.4g}, "
+                  f"log marginal likelihood={self.results.log_ml:.4f}")
+            print(pd.DataFrame(self.results.B, columns=self.endog.columns))
+        elif not self.use_ridge:
             print(self.results.summary())
         else:
-            print("Ridge VAR coefficients:")
-            for var, coef in self.results.items():
-                print(f"Variable {var}: Coefs shape {coef.shape}")
+            print(f"Ridge VAR({self.lags}), alpha={self.results.alpha:.4g}")
+            print(pd.DataFrame(self.results.B, columns=self.endog.columns))
+
+
+def _sketch_points(values: np.ndarray, size: int) -> np.ndarray:
+    """
+    Quantiles of values along axis 0 at the probabilities (i + 0.5) / size.
+    """
+    return np.quantile(values, (np.arange(size) + 0.5) / size, axis=0)
+
+
+def _merge_sketches(a, b, size: int):
+    """
+    Merge two quantile sketches (points, n_draws) into one of `size` points.
+
+    The points of each sketch carry equal weights n_draws / n_points; the
+    union is sorted cell by cell and its weighted quantile function is read
+    at the probabilities (i + 0.5) / size.
+    """
+    if a is None:
+        return b
+    (Va, na), (Vb, nb) = a, b
+    shape = Va.shape[1:]
+    U = np.concatenate([Va, Vb]).reshape(len(Va) + len(Vb), -1)
+    w = np.concatenate([np.full(len(Va), na / len(Va)), np.full(len(Vb), nb / len(Vb))])
+    order = np.argsort(U, axis=0, kind='stable')
+    U = np.take_along_axis(U, order, axis=0)
+    W = w[order]
+    P = (np.cumsum(W, axis=0) - W / 2) / (na + nb)
+    targets = (np.arange(size) + 0.5) / size
+    out = np.empty((size, U.shape[1]))
+    for c in range(U.shape[1]):
+        out[:, c] = np.interp(targets, P[:, c], U[:, c])
+    return out.reshape((size,) + shape), na + nb
+
+
+def _sketch_quantiles(points: np.ndarray, quantiles) -> np.ndarray:
+    """
+    Quantiles (len(quantiles), ...) read from the points of a sketch.
+    """
+    size = len(points)
+    pos = np.clip(np.asarray(quantiles, dtype=float) * size - 0.5, 0, size - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, size - 1)
+    frac = (pos - lo).reshape((-1,) + (1,) * (points.ndim - 1))
+    return points[lo] * (1 - frac) + points[hi] * frac
@@ -1,55 +1,210 @@
+import copy
+import warnings
 import numpy as np
 import pandas as pd
+from types import SimpleNamespace
+from scipy.linalg import solve_discrete_lyapunov
 from statsmodels.tsa.statespace.dynamic_factor import DynamicFactor
 
+from nowcasting_toolbox_py.models.kalman import kalman_filter, kalman_smoother, kalman_smoother_extend
+
+# Mariano-Murasawa weights linking a quarterly growth rate to the monthly
+# latent growth rates of the current and previous four months.
+QUARTERLY_WEIGHTS = np.array([1.0, 2.0, 3.0, 2.0, 1.0])
+
+
+class DFMParamChain:
+    """
+    Chain of EM parameter estimates indexed by data vintage.
+
+    Passed to successive DynamicFactorModel fits (e.g. consecutive nowcast
+    runs or the vintages of a pseudo-real-time evaluation) so that each fit
+    starts EM from the estimate of the closest earlier vintage and stores its
+    own estimate for the next one.
+
+    Attributes:
+        params: dict mapping vintage (Timestamp) to the params namespace of a fit.
+    """
+    def __init__(self):
+        self.params = {}
+
+    def store(self, vintage, params: SimpleNamespace) -> None:
+        """
+        Record the parameters estimated on a vintage.
+
+        Args:
+            vintage: date of the data vintage.
+            params: params namespace from DynamicFactorModel.results.params.
+        """
+        self.params[pd.Timestamp(vintage)] = copy.deepcopy(params)
+
+    def previous(self, vintage):
+        """
+        Parameters of the latest vintage not after `vintage`.
+
+        Args:
+            vintage: date of the data vintage being estimated.
+
+        Returns:
+            params namespace, or None if the chain has no earlier vintage.
+        """
+        vintage = pd.Timestamp(vintage)
+        earlier = [v for v in self.params if v <= vintage]
+        if not earlier:
+            return None
+        return copy.deepcopy(self.params[max(earlier)])
+
 
 class DynamicFactorModel:
     """
-    Dynamic Factor Model wrapper around statsmodels DynamicFactor.
+    Mixed-frequency Dynamic Factor Model.
+
+    The default estimator is the EM algorithm of Banbura and Modugno (2014):
+    a Kalman filter/smoother E-step with closed-form M-step updates, which
+    handles arbitrary patterns of missing data (ragged edge, quarterly series
+    observed every third month). Quarterly series are the last `n_quarterly`
+    columns of `endog` and load on the monthly factors through the
+    Mariano-Murasawa aggregation. The statsmodels MLE path is kept available
+    through method='mle' (monthly data only).
 
     Attributes:
         endog: Observed data (pandas DataFrame, columns as series).
         k_factors: Number of common factors.
         factor_order: AR order of factors.
-        error_order: AR order of idiosyncratic errors.
-        model: statsmodels DynamicFactor instance.
+        error_order: AR order of idiosyncratic errors (0 = iid, 1 = AR(1)).
+        n_quarterly: Number of quarterly series (last columns of endog).
+        method: 'em' (default) or 'mle'.
+        thresh: EM convergence threshold on the relative log-likelihood change.
+        max_iter: Maximum number of EM iterations.
+        param_chain: Optional DFMParamChain used to warm-start EM across vintages.
+        vintage: Date of the data vintage (defaults to the last date with data).
+        model: statsmodels DynamicFactor instance (method='mle' only).
         results: Fitted model results.
     """
     def __init__(self,
                  endog: pd.DataFrame,
                  k_factors: int,
                  factor_order: int = 1,
-                 error_order: int = 1):
+                 error_order: int = 1,
+                 n_quarterly: int = 0,
+                 method: str = 'em',
+                 thresh: float = 1e-4,
+                 max_iter: int = 100,
+                 param_chain: DFMParamChain = None,
+                 vintage=None):
         """
         Initialize the Dynamic Factor Model.
 
         Args:
-            endog: DataFrame with observed series (columns).
+            endog: DataFrame with observed series (columns), monthly first and
+                   quarterly last, NaN where not observed.
             k_factors: Number of latent common factors.
             factor_order: AR order for the factors.
-            error_order: AR order for idiosyncratic errors.
+            error_order: AR order for idiosyncratic errors (0 or 1).
+            n_quarterly: Number of quarterly series at the end of endog.
+            method: 'em' for the native EM estimator, 'mle' for statsmodels.
+            thresh: EM convergence threshold (Par.thresh).
+            max_iter: Maximum number of EM iterations (Par.max_iter).
+            param_chain: DFMParamChain shared across vintages. The fit starts
+                         from the closest earlier vintage in the chain and
+                         stores its own estimate under `vintage`.
+            vintage: Date of the data vintage; if None, the last row of endog
+                     with any observation.
         """
         self.endog = endog
         self.k_factors = k_factors
         self.factor_order = factor_order
         self.error_order = error_order
+        self.n_quarterly = n_quarterly
+        self.method = method.lower()
+        self.thresh = thresh
+        self.max_iter = max_iter
+        self.param_chain = param_chain
+        if vintage is None:
+            observed = endog.notna().any(axis=1)
+            vintage = endog.index[observed.values][-1] if observed.any() else endog.index[-1]
+        self.vintage = vintage
         self.model = None
         self.results = None
 
-    def fit(self, **fit_kwargs) -> None:
+    def fit(self, init_params: SimpleNamespace = None, **fit_kwargs) -> None:
         """
         Fit the Dynamic Factor Model to the data.
 
         Args:
-            **fit_kwargs: Keyword arguments passed to statsmodels DynamicFactor.fit().
+            init_params: Parameters of an earlier EM fit (results.params) used as
+                         the EM starting point instead of principal components.
+                         If None and a param_chain is set, the chain supplies them.
+            **fit_kwargs: Keyword arguments passed to statsmodels DynamicFactor.fit()
+                          when method='mle'. Ignored by the EM estimator.
+        """
+        if self.method == 'mle':
+            self.model = DynamicFactor(
+                endog=self.endog,
+                k_factors=self.k_factors,
+                factor_order=self.factor_order,
+                error_order=self.error_order
+            )
+            self.results = self.model.fit(**fit_kwargs)
+        elif self.method == 'em':
+            self.results = self._fit_em(init_params)
+            if self.param_chain is not None:
+                self.param_chain.store(self.vintage, self.results.params)
+        else:
+            raise ValueError(f"Unknown estimation method: {self.method}")
+
+    def _fit_em(self, init_params: SimpleNamespace = None) -> SimpleNamespace:
+        """
+        Run the EM algorithm and return the Res-like results namespace.
         """
-        self.model = DynamicFactor(
-            endog=self.endog,
-            k_factors=self.k_factors,
-            factor_order=self.factor_order,
-            error_order=self.error_order
-        )
-        self.results = self.model.fit(**fit_kwargs)
+        X = self.endog.values.astype(float)
+        Mx = np.nanmean(X, axis=0)
+        Wx = np.nanstd(X, axis=0)
+        Wx[~np.isfinite(Wx) | (Wx == 0)] = 1.0
+        x = (X - Mx) / Wx
+
+        layout = _state_layout(X.shape[1], self.n_quarterly, self.k_factors,
+                               self.factor_order, bool(self.error_order))
+        warm_start = init_params is not None
+        if init_params is None and self.param_chain is not None:
+            init_params = self.param_chain.previous(self.vintage)
+        if init_params is not None and not _params_match(init_params, layout):
+            if warm_start:
+                raise ValueError("init_params do not match the model dimensions.")
+            warnings.warn("DynamicFactorModel: stored parameters do not match the model "
+                          "dimensions, starting EM from principal components.", UserWarning)
+            init_params = None
+        if init_params is not None:
+            params = copy.deepcopy(init_params)
+        else:
+            params = _initial_params(x, layout)
+
+        loglik_prev = -np.inf
+        converged = False
+        n_iter = 0
+        for n_iter in range(1, self.max_iter + 1):
+            C, A, Q = _system_matrices(params, layout)
+            filt = kalman_filter(x, C, params.R, A, Q, params.Z0, params.V0)
+            smooth = kalman_smoother(A, filt)
+            params = _em_step(x, smooth, params, layout)
+            converged = _em_converged(filt.loglik, loglik_prev, self.thresh)
+            loglik_prev = filt.loglik
+            if converged:
+                break
+
+        C, A, Q = _system_matrices(params, layout)
+        filt = kalman_filter(x, C, params.R, A, Q, params.Z0, params.V0)
+        smooth = kalman_smoother(A, filt)
+        X_sm = pd.DataFrame(smooth.Zs @ C.T * Wx + Mx,
+                            index=self.endog.index, columns=self.endog.columns)
+        F = pd.DataFrame(smooth.Zs[:, :layout.r], index=self.endog.index,
+                         columns=[f"factor_{i + 1}" for i in range(layout.r)])
+        return SimpleNamespace(X_sm=X_sm, F=F, C=C, R=params.R, A=A, Q=Q,
+                               Z_0=params.Z0, V_0=params.V0, Mx=Mx, Wx=Wx,
+                               r=layout.r, p=layout.p, params=params,
+                               layout=layout, loglik=filt.loglik,
+                               n_iter=n_iter, converged=converged,
+                               filt=filt, smooth=smooth)
 
     def nowcast(self) -> pd.DataFrame:
         """
@@ -60,12 +215,319 @@ class DynamicFactorModel:
         """
         if self.results is None:
             raise ValueError("Model must be fitted before creating nowcasts.")
+        if self.method == 'em':
+            return self.results.X_sm
         return self.results.predict()
 
+    def update(self, new_obs: pd.DataFrame) -> pd.DataFrame:
+        """
+        Incorporate new data releases keeping the estimated parameters fixed.
+
+        Only the Kalman filter from the first period touched by the release
+        onwards is rerun. The smoother is then run back to the start of the
+        sample, reusing the stored smoother gains before that period, so every
+        smoothed value (including backcasts) reflects the release without
+        refiltering the whole sample.
+
+        Args:
+            new_obs: DataFrame of new or revised observations. Its index must be
+                     contained in the index of endog and its columns in the
+                     columns of endog; NaN entries are ignored.
+
+        Returns:
+            DataFrame of revised nowcasts indexed like endog.
+        """
+        if self.results is None:
+            raise ValueError("Model must be fitted before updating.")
+        if self.method != 'em':
+            raise ValueError("Incremental updates require the EM estimator.")
+        if not new_obs.columns.isin(self.endog.columns).all():
+            raise ValueError("new_obs contains series that are not in the model.")
+        released = new_obs.index[new_obs.notna().any(axis=1).values]
+        if len(released) == 0:
+            return self.results.X_sm
+        positions = self.endog.index.get_indexer(released)
+        if (positions < 0).any():
+            raise ValueError("new_obs contains dates outside the model sample.")
+
+        res = self.results
+        self.endog = self.endog.copy()
+        self.endog.update(new_obs)
+        t0 = positions.min()
+        x = (self.endog.values[t0:].astype(float) - res.Mx) / res.Wx
+
+        filt, smooth = res.filt, res.smooth
+        seg = kalman_filter(x, res.C, res.R, res.A, res.Q, filt.Zp[t0], filt.Vp[t0])
+        filt.Zp[t0:], filt.Vp[t0:] = seg.Zp, seg.Vp
+        filt.Zf[t0:], filt.Vf[t0:] = seg.Zf, seg.Vf
+        seg_smooth = kalman_smoother(res.A, seg)
+        smooth.Zs[t0:], smooth.Vs[t0:] = seg_smooth.Zs, seg_smooth.Vs
+        smooth.VVs[t0 + 1:] = seg_smooth.VVs[1:]
+        smooth.J[t0:] = seg_smooth.J
+        kalman_smoother_extend(filt, smooth, t0)
+
+        res.X_sm.iloc[:] = smooth.Zs @ res.C.T * res.Wx + res.Mx
+        res.F.iloc[:] = smooth.Zs[:, :res.r]
+        return res.X_sm
+
     def summarize(self) -> None:
         """
         Print a summary of the fitted model.
         """
         if self.results is None:
             raise ValueError("Model must be fitted before summarizing.")
-        print(self.results.summary())
+        if self.method != 'em':
+            print(self.results.summary())
+            return
+        res = self.results
+        status = "converged" if res.converged else "not converged"
+        print(f"Dynamic Factor Model (EM): r={res.r}, p={res.p}, "
+              f"{self.endog.shape[1] - self.n_quarterly} monthly / {self.n_quarterly} quarterly series")
+        print(f"Log-likelihood: {res.loglik:.4f} after {res.n_iter} iterations ({status})")
+        loadings = pd.DataFrame(res.params.Lambda, index=self.endog.columns,
+                                columns=res.F.columns)
+        print(loadings.round(4))
+
+
+def _state_layout(N: int, nQ: int, r: int, p: int, idio: bool) -> SimpleNamespace:
+    """
+    Describe the positions of factors and idiosyncratic components in the state.
+
+    The state stacks L lags of the r factors (L = max(p, 5) with quarterly
+    data so the aggregation can reach t-4), one AR(1) idiosyncratic state per
+    monthly series when idio is True, and five lags of an idiosyncratic state
+    per quarterly series.
+    """
+    nM = N - nQ
+    L = max(p, 5) if nQ > 0 else p
+    n_f = r * L
+    n_im = nM if idio else 0
+    i_idio_m = n_f + np.arange(n_im)
+    i_idio_q = n_f + n_im + 5 * np.arange(nQ)
+    m = n_f + n_im + 5 * nQ
+    return SimpleNamespace(N=N, nM=nM, nQ=nQ, r=r, p=p, L=L, idio=idio, m=m,
+                           n_f=n_f, i_idio_m=i_idio_m, i_idio_q=i_idio_q,
+                           i_idio=np.concatenate([i_idio_m, i_idio_q]).astype(int))
+
+
+def _params_match(params: SimpleNamespace, layout: SimpleNamespace) -> bool:
+    """
+    Check that a params namespace has the dimensions implied by the layout.
+    """
+    return (params.Lambda.shape == (layout.N, layout.r)
+            and params.A_f.shape == (layout.r, layout.r * layout.p)
+            and params.rho.shape == (len(layout.i_idio),)
+            and params.Z0.shape == (layout.m,))
+
+
+def _quarterly_selector(layout: SimpleNamespace) -> np.ndarray:
+    """
+    (r, m) matrix mapping the state to the aggregated factor sum_k c_k f_{t-k}.
+    """
+    Mq = np.zeros((layout.r, layout.m))
+    for k, c in enumerate(QUARTERLY_WEIGHTS):
+        Mq[:, k * layout.r:(k + 1) * layout.r] = c * np.eye(layout.r)
+    return Mq
+
+
+def _system_matrices(params: SimpleNamespace, layout: SimpleNamespace):
+    """
+    Build the observation (C), transition (A) and state covariance (Q) matrices.
+    """
+    r, p, L, m, nM = layout.r, layout.p, layout.L, layout.m, layout.nM
+    C = np.zeros((layout.N, m))
+    C[:nM, :r] = params.Lambda[:nM]
+    C[nM:] = params.Lambda[nM:] @ _quarterly_selector(layout)
+    C[np.arange(len(layout.i_idio_m)), layout.i_idio_m] = 1.0
+    for j, q in enumerate(layout.i_idio_q):
+        C[nM + j, q:q + 5] = QUARTERLY_WEIGHTS
+
+    A = np.zeros((m, m))
+    Q = np.zeros((m, m))
+    A[:r, :r * p] = params.A_f
+    A[r:layout.n_f, :layout.n_f - r] = np.eye(layout.n_f - r)
+    Q[:r, :r] = params.Q_f
+    A[layout.i_idio, layout.i_idio] = params.rho
+    Q[layout.i_idio, layout.i_idio] = params.sig2
+    for q in layout.i_idio_q:
+        A[q + 1:q + 5, q:q + 4] = np.eye(4)
+    return C, A, Q
+
+
+def _stationary_cov(A: np.ndarray, Q: np.ndarray) -> np.ndarray:
+    """
+    Unconditional covariance V solving V = A V A' + Q.
+    """
+    try:
+        V = solve_discrete_lyapunov(A, Q)
+    except (np.linalg.LinAlgError, ValueError):
+        n = A.shape[0]
+        lhs = np.eye(n * n) - np.kron(A, A)
+        V = np.linalg.lstsq(lhs, Q.ravel(), rcond=None)[0].reshape(n, n)
+    return 0.5 * (V + V.T)
+
+
+def _initial_params(x: np.ndarray, layout: SimpleNamespace) -> SimpleNamespace:
+    """
+    Starting values from principal components of the interpolated panel.
+    """
+    r, p, nM, nQ = layout.r, layout.p, layout.nM, layout.nQ
+    T = x.shape[0]
+    observed = ~np.isnan(x)
+    xf = pd.DataFrame(x).interpolate(limit_area='inside').fillna(0.0).values
+
+    eigval, eigvec = np.linalg.eigh(np.cov(xf, rowvar=False))
+    v = eigvec[:, ::-1][:, :r]
+    F = xf @ v
+
+    Lambda = np.zeros((layout.N, r))
+    resid = np.full_like(x, np.nan)
+    for i in range(nM):
+        obs = observed[:, i]
+        Lambda[i] = np.linalg.lstsq(F[obs], x[obs, i], rcond=None)[0]
+        resid[:, i] = xf[:, i] - F @ Lambda[i]
+    G = np.zeros((T, r))
+    for k, c in enumerate(QUARTERLY_WEIGHTS):
+        G[4:] += c * F[4 - k:T - k]
+    for j in range(nQ):
+        i = nM + j
+        obs = observed[:, i] & (np.arange(T) >= 4)
+        if obs.sum() > r:
+            Lambda[i] = np.linalg.lstsq(G[obs], x[obs, i], rcond=None)[0]
+        resid[obs, i] = x[obs, i] - G[obs] @ Lambda[i]
+
+    # Factor VAR(p) by OLS
+    Y = F[p:]
+    Xlag = np.hstack([F[p - k - 1:T - k - 1] for k in range(p)])
+    A_f = np.linalg.lstsq(Xlag, Y, rcond=None)[0].T
+    Q_f = np.cov(Y - Xlag @ A_f.T, rowvar=False).reshape(r, r)
+
+    R = np.full(layout.N, 1e-4)
+    e_m = resid[:, :nM]
+    if layout.idio:
+        rho_m = (e_m[1:] * e_m[:-1]).sum(0) / np.maximum((e_m[:-1] ** 2).sum(0), 1e-12)
+        rho_m = np.clip(rho_m, -0.99, 0.99)
+        sig2_m = np.maximum(np.var(e_m[1:] - rho_m * e_m[:-1], axis=0), 1e-4)
+    else:
+        rho_m = np.zeros(0)
+        sig2_m = np.zeros(0)
+        R[:nM] = np.maximum(np.var(e_m, axis=0), 1e-4)
+    sig2_q = np.array([np.nanvar(resid[:, nM + j]) / 19.0 if np.isfinite(resid[:, nM + j]).any()
+                       else 0.1 for j in range(nQ)])
+    sig2_q = np.maximum(np.nan_to_num(sig2_q, nan=0.1), 1e-4)
+    rho = np.concatenate([rho_m, np.zeros(nQ)])
+    sig2 = np.concatenate([sig2_m, sig2_q])
+
+    params = SimpleNamespace(Lambda=Lambda, A_f=A_f, Q_f=Q_f, rho=rho, sig2=sig2, R=R,
+                             Z0=np.zeros(layout.m), V0=None)
+    params.V0 = _initial_cov(params, layout)
+    return params
+
+
+def _initial_cov(params: SimpleNamespace, layout: SimpleNamespace) -> np.ndarray:
+    """
+    Block-diagonal unconditional covariance of the state.
+    """
+    _, A, Q = _system_matrices(params, layout)
+    V0 = np.zeros((layout.m, layout.m))
+    n_f = layout.n_f
+    V0[:n_f, :n_f] = _stationary_cov(A[:n_f, :n_f], Q[:n_f, :n_f])
+    var = params.sig2 / (1.0 - params.rho ** 2)
+    V0[layout.i_idio_m, layout.i_idio_m] = var[:len(layout.i_idio_m)]
+    lags = np.arange(5)
+    for j, q in enumerate(layout.i_idio_q):
+        k = len(layout.i_idio_m) + j
+        V0[q:q + 5, q:q + 5] = var[k] * params.rho[k] ** np.abs(lags[:, None] - lags[None, :])
+    return V0
+
+
+def _em_step(x: np.ndarray, smooth: SimpleNamespace, params: SimpleNamespace,
+             layout: SimpleNamespace) -> SimpleNamespace:
+    """
+    M-step of Banbura and Modugno (2014) given the smoothed state moments.
+    """
+    Zs, Vs, VVs = smooth.Zs, smooth.Vs, smooth.VVs
+    T = x.shape[0]
+    r, p, nM, nQ = layout.r, layout.p, layout.nM, layout.nQ
+    rp = r * p
+
+    # Sums of second moments E[s_t s_t'], E[s_{t-1} s_{t-1}'], E[s_t s_{t-1}']
+    S11 = Zs[1:].T @ Zs[1:] + Vs[1:].sum(0)
+    S00 = Zs[:-1].T @ Zs[:-1] + Vs[:-1].sum(0)
+    S10 = Zs[1:].T @ Zs[:-1] + VVs[1:].sum(0)
+
+    # Factor VAR
+    A_f = np.linalg.solve(S00[:rp, :rp], S10[:r, :rp].T).T
+    Q_f = (S11[:r, :r] - A_f @ S10[:r, :rp].T) / (T - 1)
+    Q_f = 0.5 * (Q_f + Q_f.T)
+
+    # Idiosyncratic AR(1) states
+    k = layout.i_idio
+    n_im = len(layout.i_idio_m)
+    rho = S10[k, k] / S00[k, k]
+    # Quarterly idiosyncratic components are white noise at the monthly
+    # frequency: their persistence is poorly identified from one observation
+    # every three months and EM otherwise drifts along a flat ridge.
+    rho[n_im:] = 0.0
+    if not layout.idio:
+        rho[:] = 0.0
+    rho = np.clip(rho, -0.99, 0.99)
+    sig2 = np.maximum((S11[k, k] - rho * S10[k, k]) / (T - 1), 1e-4)
+
+    observed = ~np.isnan(x)
+    W = observed.astype(float)
+    x0 = np.where(observed, x, 0.0)
+    Lambda = params.Lambda.copy()
+
+    # Monthly loadings
+    Ef = Zs[:, :r]
+    Eff = Ef[:, :, None] * Ef[:, None, :] + Vs[:, :r, :r]
+    denom = np.einsum('ti,tab->iab', W[:, :nM], Eff)
+    numer = x0[:, :nM].T @ Ef
+    if n_im:
+        km = layout.i_idio_m
+        Efe = Ef[:, :, None] * Zs[:, None, km] + Vs[:, :r][:, :, km]
+        numer -= np.einsum('ti,tai->ia', W[:, :nM], Efe)
+    Lambda[:nM] = np.linalg.solve(denom, numer[..., None])[..., 0]
+
+    # Quarterly loadings with the aggregation restriction
+    if nQ:
+        Mq = _quarterly_selector(layout)
+        Hq = np.zeros((nQ, layout.m))
+        for j, q in enumerate(layout.i_idio_q):
+            Hq[j, q:q + 5] = QUARTERLY_WEIGHTS
+        Eu = Zs @ Mq.T
+        Ev = Zs @ Hq.T
+        MV = np.einsum('am,tmn->tan', Mq, Vs)
+        Euu = Eu[:, :, None] * Eu[:, None, :] + MV @ Mq.T
+        Euv = Eu[:, :, None] * Ev[:, None, :] + MV @ Hq.T
+        Wq = W[:, nM:]
+        denom_q = np.einsum('tj,tab->jab', Wq, Euu)
+        numer_q = x0[:, nM:].T @ Eu - np.einsum('tj,taj->ja', Wq, Euv)
+        Lambda[nM:] = np.linalg.solve(denom_q, numer_q[..., None])[..., 0]
+
+    # Observation noise for monthly series without idiosyncratic states
+    R = params.R.copy()
+    if not layout.idio and nM:
+        lam = Lambda[:nM]
+        fitted = Ef @ lam.T
+        var = np.einsum('ia,tab,ib->ti', lam, Vs[:, :r, :r], lam)
+        sse = (W[:, :nM] * ((x0[:, :nM] - fitted) ** 2 + var)).sum(0)
+        R[:nM] = np.maximum(sse / np.maximum(W[:, :nM].sum(0), 1.0), 1e-4)
+
+    # The initial state keeps its unconditional distribution: re-estimating it
+    # from the smoother makes EM crawl as V0 collapses.
+    params = SimpleNamespace(Lambda=Lambda, A_f=A_f, Q_f=Q_f, rho=rho, sig2=sig2, R=R,
+                             Z0=np.zeros(layout.m), V0=None)
+    params.V0 = _initial_cov(params, layout)
+    return params
+
+
+def _em_converged(loglik: float, loglik_prev: float, thresh: float) -> bool:
+    """
+    Relative change criterion used in the original toolbox.
+    """
+    if not np.isfinite(loglik_prev):
+        return False
+    avg = (abs(loglik) + abs(loglik_prev) + np.finfo(float).eps) / 2
+    return abs(loglik - loglik_prev) / avg < thresh
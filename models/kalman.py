@@ -0,0 +1,186 @@
+import numpy as np
+from types import SimpleNamespace
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
+
+
+def _solve_sym(S: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """
+    Solve S X = B for a symmetric (semi-)definite S, falling back to
+    least squares when S is numerically singular.
+    """
+    try:
+        return cho_solve(cho_factor(S, check_finite=False), B, check_finite=False)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(S, B, rcond=None)[0]
+
+
+def _cholesky_jitter(F: np.ndarray) -> np.ndarray:
+    """
+    Lower Cholesky factor of F, adding a growing diagonal jitter if F is not
+    numerically positive definite.
+    """
+    jitter = 0.0
+    scale = max(np.abs(np.diag(F)).max(), 1.0)
+    for _ in range(8):
+        try:
+            return np.linalg.cholesky(F + jitter * np.eye(F.shape[0]))
+        except np.linalg.LinAlgError:
+            jitter = scale * 1e-10 if jitter == 0.0 else jitter * 100
+    raise np.linalg.LinAlgError("Innovation covariance is not positive definite.")
+
+
+def kalman_filter(y: np.ndarray,
+                  C: np.ndarray,
+                  R: np.ndarray,
+                  A: np.ndarray,
+                  Q: np.ndarray,
+                  Z0: np.ndarray,
+                  V0: np.ndarray) -> SimpleNamespace:
+    """
+    Kalman filter for the linear Gaussian state-space model
+
+        y_t = C s_t + e_t,      e_t ~ N(0, diag(R))
+        s_t = A s_{t-1} + u_t,  u_t ~ N(0, Q)
+
+    with missing observations (NaN) handled by dropping the unobserved rows
+    of C and R at each period. Z0, V0 is the prior of the first state s_0.
+
+    Args:
+        y: (T, N) array of observations, NaN where missing.
+        C: (N, m) observation matrix.
+        R: (N,) observation noise variances.
+        A: (m, m) transition matrix.
+        Q: (m, m) state noise covariance.
+        Z0: (m,) prior mean of the first state.
+        V0: (m, m) prior covariance of the first state.
+
+    Returns:
+        SimpleNamespace with attributes:
+            Zp, Vp: predicted states/covariances, (T+1, m) and (T+1, m, m);
+                    Zp[t] = E[s_t | y_1..y_{t-1}], Zp[T] is the one-step forecast.
+            Zf, Vf: filtered states/covariances, (T, m) and (T, m, m).
+            loglik: Gaussian log-likelihood of the observed data.
+    """
+    T, N = y.shape
+    m = A.shape[0]
+    Zp = np.empty((T + 1, m))
+    Vp = np.empty((T + 1, m, m))
+    Zf = np.empty((T, m))
+    Vf = np.empty((T, m, m))
+    Zp[0] = Z0
+    Vp[0] = V0
+    observed = ~np.isnan(y)
+    loglik = 0.0
+    for t in range(T):
+        z, V = Zp[t], Vp[t]
+        obs = observed[t]
+        if obs.any():
+            Ct = C[obs]
+            VC = V @ Ct.T
+            F = Ct @ VC
+            F[np.diag_indices_from(F)] += R[obs]
+            F = 0.5 * (F + F.T)
+            v = y[t, obs] - Ct @ z
+            L = _cholesky_jitter(F)
+            Linv_v = solve_triangular(L, v, lower=True, check_finite=False)
+            Linv_CV = solve_triangular(L, VC.T, lower=True, check_finite=False)
+            logdet = 2.0 * np.log(np.diag(L)).sum()
+            z = z + Linv_CV.T @ Linv_v
+            V = V - Linv_CV.T @ Linv_CV
+            loglik -= 0.5 * (logdet + Linv_v @ Linv_v + obs.sum() * np.log(2 * np.pi))
+        Zf[t] = z
+        Vf[t] = 0.5 * (V + V.T)
+        Zp[t + 1] = A @ z
+        Vp[t + 1] = A @ Vf[t] @ A.T + Q
+    return SimpleNamespace(Zp=Zp, Vp=Vp, Zf=Zf, Vf=Vf, loglik=loglik)
+
+
+def kalman_smoother(A: np.ndarray, filt: SimpleNamespace) -> SimpleNamespace:
+    """
+    Rauch-Tung-Striebel fixed-interval smoother on the output of kalman_filter.
+
+    Args:
+        A: (m, m) transition matrix used in the filter.
+        filt: result of kalman_filter.
+
+    Returns:
+        SimpleNamespace with attributes:
+            Zs: (T, m) smoothed states.
+            Vs: (T, m, m) smoothed state covariances.
+            VVs: (T, m, m) lag-one covariances, VVs[t] = Cov(s_t, s_{t-1} | y), VVs[0] = 0.
+            J: (T-1, m, m) smoother gains, with Cov(s_u, s_t | y) = J[u] ... J[t-1] Vs[t]
+               for u < t.
+    """
+    Zf, Vf, Zp, Vp = filt.Zf, filt.Vf, filt.Zp, filt.Vp
+    T, m = Zf.shape
+    Zs = np.empty((T, m))
+    Vs = np.empty((T, m, m))
+    VVs = np.zeros((T, m, m))
+    Js = np.empty((max(T - 1, 0), m, m))
+    Zs[-1] = Zf[-1]
+    Vs[-1] = Vf[-1]
+    for t in range(T - 2, -1, -1):
+        # J_t = Vf[t] A' Vp[t+1]^{-1}
+        J = _solve_sym(Vp[t + 1], A @ Vf[t]).T
+        Zs[t] = Zf[t] + J @ (Zs[t + 1] - Zp[t + 1])
+        Vs[t] = Vf[t] + J @ (Vs[t + 1] - Vp[t + 1]) @ J.T
+        Vs[t] = 0.5 * (Vs[t] + Vs[t].T)
+        VVs[t + 1] = Vs[t + 1] @ J.T
+        Js[t] = J
+    return SimpleNamespace(Zs=Zs, Vs=Vs, VVs=VVs, J=Js)
+
+
+def kalman_smoother_extend(filt: SimpleNamespace, smooth: SimpleNamespace, t0: int) -> None:
+    """
+    Continue the RTS recursion of kalman_smoother below period t0, in place.
+
+    Used after the filter and smoother have been rerun from t0 onwards: the
+    filtered moments and smoother gains before t0 do not depend on later data,
+    so the stored gains J are reused and no covariance is inverted.
+
+    Args:
+        filt: result of kalman_filter, up to date for the whole sample.
+        smooth: result of kalman_smoother, up to date from t0 onwards.
+        t0: first period whose smoothed moments are already up to date.
+    """
+    Zf, Vf, Zp, Vp = filt.Zf, filt.Vf, filt.Zp, filt.Vp
+    Zs, Vs, VVs, Js = smooth.Zs, smooth.Vs, smooth.VVs, smooth.J
+    for t in range(t0 - 1, -1, -1):
+        J = Js[t]
+        Zs[t] = Zf[t] + J @ (Zs[t + 1] - Zp[t + 1])
+        Vs[t] = Vf[t] + J @ (Vs[t + 1] - Vp[t + 1]) @ J.T
+        Vs[t] = 0.5 * (Vs[t] + Vs[t].T)
+        VVs[t + 1] = Vs[t + 1] @ J.T
+
+
+def projected_cross_cov(smooth: SimpleNamespace, H: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """
+    Covariance matrix of h_k' s_{t_k} across rows k given the smoothed information set.
+
+    Uses Cov(s_u, s_t | y) = J_u ... J_{t-1} Vs_t for u < t, propagating the
+    projections H' backwards so each step costs O(m^2 n) instead of O(m^3).
+
+    Args:
+        smooth: result of kalman_smoother (needs Vs and J).
+        H: (n, m) loading rows.
+        times: (n,) time index of each row.
+
+    Returns:
+        (n, n) covariance matrix.
+    """
+    n = len(times)
+    Sigma = np.zeros((n, n))
+    unique_times = np.unique(times)
+    t_min = unique_times[0] if n else 0
+    for b in unique_times:
+        cols = np.flatnonzero(times == b)
+        G = smooth.Vs[b] @ H[cols].T
+        for u in range(b, t_min - 1, -1):
+            if u < b:
+                G = smooth.J[u] @ G
+            rows = np.flatnonzero(times == u)
+            if len(rows):
+                block = H[rows] @ G
+                Sigma[np.ix_(rows, cols)] = block
+                Sigma[np.ix_(cols, rows)] = block.T
+    return Sigma
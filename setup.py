@@ -23,6 +23,7 @@ setup(
     install_requires=[
         "pandas>=1.5",
         "numpy>=1.23",
+        "scipy>=1.8",
         "scikit-learn>=1.2",
         "statsmodels>=0.14",
         "matplotlib>=3.6",
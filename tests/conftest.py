@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def mixed_panel():
+    # Panel mensual con un factor AR(1) y una serie trimestral agregada
+    T, nM = 120, 8
+    rng = np.random.default_rng(0)
+    f = np.zeros(T)
+    for t in range(1, T):
+        f[t] = 0.7 * f[t - 1] + rng.standard_normal()
+    X = np.outer(f, rng.uniform(0.5, 1.5, nM)) + 0.5 * rng.standard_normal((T, nM))
+    q = np.full(T, np.nan)
+    for t in range(4, T):
+        if t % 3 == 2:
+            q[t] = (f[t] + 2 * f[t - 1] + 3 * f[t - 2] + 2 * f[t - 3] + f[t - 4]) / 3 \
+                + 0.3 * rng.standard_normal()
+    X[-2:, :3] = np.nan
+    idx = pd.date_range('2000-01-01', periods=T, freq='MS')
+    cols = [f"m{i}" for i in range(nM)] + ['gdp']
+    return pd.DataFrame(np.column_stack([X, q]), index=idx, columns=cols)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, Ridge
+from nowcasting_toolbox_py.models.bridge import BatchBridgeRegression, bridge_specs, lagged_design
+
+
+def make_quarterly_panel(T=80, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.standard_normal((T, 4)), columns=['a', 'b', 'c', 'gdp'])
+    data['gdp'] += data['a'] + 0.5 * data['b'].shift(1).fillna(0)
+    return data
+
+
+def test_batch_bridge_matches_single_fits():
+    data = make_quarterly_panel()
+    X = pd.concat([lagged_design(data, ['a', 'b', 'c'], 3), lagged_design(data, ['gdp'], 1, 1)], axis=1)
+    specs = bridge_specs([['a'], ['a', 'b'], ['c']], range(4), range(2), 'gdp')
+    for method, reg in [('ols', LinearRegression()), ('ridge', Ridge(alpha=2.0))]:
+        batch = BatchBridgeRegression(method, alpha=2.0)
+        res = batch.fit(X, data['gdp'], specs)
+        assert res.coefs.shape == (len(specs), 1 + max(len(s) for s in specs))
+        # Equations nested in the lag grid share the sample of the longest one
+        rows = np.arange(len(data)) >= 3
+        for i, spec in enumerate(specs):
+            reg.fit(X.loc[rows, spec], data.loc[rows, 'gdp'])
+            np.testing.assert_allclose(res.coefs[i, 0], reg.intercept_, atol=1e-10)
+            np.testing.assert_allclose(res.coefs[i, 1:1 + len(spec)], reg.coef_, atol=1e-10)
+            np.testing.assert_allclose(res.fitted[i, rows], reg.predict(X.loc[rows, spec]), atol=1e-10)
+    np.testing.assert_allclose(batch.predict(X.iloc[-5:])[:, -1], res.fitted[:, -1])
+
+
+def test_recursive_bridge_matches_refit():
+    from nowcasting_toolbox_py.models.bridge import BridgeRegression
+    data = make_quarterly_panel()
+    X, y = data[['a', 'b', 'c']], data['gdp']
+    for method in ['ols', 'ridge']:
+        rls = BridgeRegression(method, alpha=2.0, recursive=True)
+        rls.fit(X.iloc[:40], y.iloc[:40])
+        # Rolling window: add two rows, drop the two oldest, revise the last one
+        rls.update(X.iloc[40:42], y.iloc[40:42])
+        rls.downdate(X.iloc[:2], y.iloc[:2])
+        y_rev = y.iloc[41:42] + 0.5
+        rls.revise(X.iloc[41:42], y.iloc[41:42], X.iloc[41:42], y_rev)
+        full = BridgeRegression(method, alpha=2.0)
+        full.fit(X.iloc[2:42], pd.concat([y.iloc[2:41], y_rev]))
+        np.testing.assert_allclose(rls.model.coef_, full.model.coef_, atol=1e-10)
+        np.testing.assert_allclose(rls.predict(X.iloc[42:]), full.predict(X.iloc[42:]), atol=1e-10)
+        assert rls.n_obs == 40
+
+
+def test_ragged_edge_fill_and_aggregation():
+    from nowcasting_toolbox_py.models.bridge import bridge_data, fill_ragged_edge
+    rng = np.random.default_rng(1)
+    index = pd.date_range('2010-01-01', periods=120, freq='MS')
+    x = np.zeros((120, 3))
+    for t in range(1, 120):
+        x[t] = 0.5 + 0.6 * x[t - 1] + rng.standard_normal(3)
+    xest = pd.DataFrame(x, index=index, columns=['m1', 'm2', 'm3'])
+    xest.iloc[-1:, 1] = np.nan
+    xest.iloc[-2:, 2] = np.nan
+    xest['gdp'] = np.where(index.month % 3 == 0, 1.0, np.nan)
+    filled = fill_ragged_edge(xest.iloc[:, :3], until='2020-03-01', p=1)
+    assert filled.index[-1] == pd.Timestamp('2020-03-01') and filled.notna().all().all()
+    # AR(1) by OLS for the second series and its iterated forecasts
+    s = xest['m2'].dropna().values
+    Z = np.column_stack([np.ones(len(s) - 1), s[:-1]])
+    c, phi = np.linalg.lstsq(Z, s[1:], rcond=None)[0]
+    expected = [c + phi * s[-1]]
+    for _ in range(3):
+        expected.append(c + phi * expected[-1])
+    np.testing.assert_allclose(filled['m2'].values[-4:], expected)
+    data = bridge_data(xest, 3, until='2020-03-01')
+    assert list(data.columns) == ['m1', 'm2', 'm3', 'gdp']
+    np.testing.assert_allclose(data.loc['2020-03-01', 'm1'], filled['m1'].iloc[-3:].mean())
+    assert data['gdp'].iloc[:-1].eq(1.0).all()
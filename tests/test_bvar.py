@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from nowcasting_toolbox_py.models.bvar import (BayesianVARModel, _merge_sketches, _sketch_points,
+                                                _sketch_quantiles)
+
+
+def make_var_panel(T=300, seed=0):
+    rng = np.random.default_rng(seed)
+    A = np.diag([0.5, 0.3, 0.6])
+    y = np.zeros((T, 3))
+    for t in range(1, T):
+        y[t] = 1 + A @ y[t - 1] + rng.standard_normal(3)
+    return pd.DataFrame(y, index=pd.date_range('2000-01-01', periods=T, freq='MS'),
+                        columns=['a', 'b', 'c'])
+
+
+def test_minnesota_diffuse_prior_matches_ols():
+    df = make_var_panel()
+    bvar = BayesianVARModel(df, lags=2, method='minnesota', lambda1=1e3, lambda_const=1e6)
+    bvar.fit()
+    ols = BayesianVARModel(df, lags=2, method='ols')
+    ols.fit()
+    np.testing.assert_allclose(bvar.results.coefs, ols.results.coefs, atol=1e-6)
+    np.testing.assert_allclose(bvar.nowcast(3), ols.nowcast(3), atol=1e-6)
+
+
+def test_minnesota_optimized_lambda():
+    bvar = BayesianVARModel(make_var_panel(), lags=2, method='minnesota')
+    bvar.fit(optimize=True, thresh=1e-6, max_iter=200)
+    assert bvar.results.log_ml >= bvar.posterior(0.05).log_ml
+    assert bvar.results.log_ml >= bvar.posterior(2.0).log_ml
+    assert bvar.nowcast(2).shape == (2, 3)
+
+
+def test_sample_forecast_quantiles():
+    bvar = BayesianVARModel(make_var_panel(), lags=2, method='minnesota')
+    bvar.fit()
+    q = bvar.sample_forecast(steps=3, n_draws=4000, quantiles=(0.16, 0.5, 0.84), seed=7)
+    assert q.shape == (3, 9)
+    median = q.xs(0.5, axis=1, level='quantile').values
+    np.testing.assert_allclose(median, bvar.nowcast(3), atol=0.1)
+    # One-step band is about two residual standard deviations
+    width = (q.xs(0.84, axis=1, level='quantile') - q.xs(0.16, axis=1, level='quantile')).values[0]
+    np.testing.assert_allclose(width, 2 * np.sqrt(np.diag(bvar.results.sigma_u)), rtol=0.1)
+    pd.testing.assert_frame_equal(q, bvar.sample_forecast(steps=3, n_draws=4000,
+                                                          quantiles=(0.16, 0.5, 0.84), seed=7))
+
+
+def test_quantile_sketch_matches_exact_quantiles():
+    draws = np.random.default_rng(3).standard_t(5, size=(8000, 2, 3))
+    sketch = None
+    for batch in np.split(draws, 16):
+        sketch = _merge_sketches(sketch, (_sketch_points(batch, 500), len(batch)), 500)
+    assert sketch[1] == 8000
+    quantiles = (0.05, 0.16, 0.5, 0.84, 0.95)
+    # Error de rango del orden de 1 / sketch_size
+    approx = _sketch_quantiles(sketch[0], quantiles)
+    lo = np.quantile(draws, np.subtract(quantiles, 0.003), axis=0)
+    hi = np.quantile(draws, np.add(quantiles, 0.003), axis=0)
+    assert np.all((approx >= lo) & (approx <= hi))
+
+
+def test_select_lags_reuses_largest_design():
+    df = make_var_panel()
+    bvar = BayesianVARModel(df, lags=1, method='minnesota', lambda1=0.3)
+    table = bvar.select_lags(4, criterion='bic')
+    assert list(table.index) == [1, 2, 3, 4]
+    assert bvar.lags == table['bic'].idxmin()
+    # Same posterior as a fit of that order on the common sample
+    fresh = BayesianVARModel(df.iloc[4 - 2:], lags=2, method='minnesota', lambda1=0.3)
+    fresh.fit()
+    np.testing.assert_allclose(bvar.posterior(0.3, 2).B, fresh.results.B)
+    np.testing.assert_allclose(table.loc[2, 'log_ml'], fresh.results.log_ml)
+
+
+def test_update_conditions_on_complete_history():
+    df = make_var_panel()
+    bvar = BayesianVARModel(df.iloc[:-5], lags=2, method='minnesota')
+    bvar.fit()
+    release = df.iloc[-5:].copy()
+    release.iloc[2, 0] = np.nan  # hueco dentro de las últimas p filas completas
+    release.iloc[4, 1] = np.nan
+    out = bvar.update(release, steps=1)
+    assert list(out.index[:3]) == list(df.index[-3:])
+    assert np.isfinite(out.values).all()
+    np.testing.assert_allclose(out.iloc[1].values, df.iloc[-2].values, atol=1e-4)
+
+
+def test_update_without_ragged_edge_or_steps():
+    df = make_var_panel()
+    bvar = BayesianVARModel(df.iloc[:-1], lags=2)
+    bvar.fit()
+    out = bvar.update(df.iloc[-1:], steps=0)
+    assert out.shape == (0, 3) and list(out.columns) == list(df.columns)
+    assert bvar.endog.index[-1] == df.index[-1]
+
+
+def test_ridge_matches_sklearn():
+    from sklearn.linear_model import Ridge
+    df = make_var_panel()
+    bvar = BayesianVARModel(df, lags=2, use_ridge=True, alpha=5.0)
+    bvar.fit()
+    X = np.hstack([df.values[1:-1], df.values[:-2]])
+    ref = Ridge(alpha=5.0).fit(X, df.values[2:])
+    np.testing.assert_allclose(np.hstack(bvar.results.coefs), ref.coef_, atol=1e-8)
+    np.testing.assert_allclose(bvar.results.intercept, ref.intercept_, atol=1e-8)
+    fcst = bvar.nowcast(2)
+    np.testing.assert_allclose(fcst[0], ref.predict(np.hstack([df.values[-1], df.values[-2]])[None, :])[0])
+    assert BayesianVARModel(df).method == 'minnesota'
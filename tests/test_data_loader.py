@@ -2,7 +2,8 @@ import pandas as pd
 import numpy as np
 import os
 import pytest
-from nowcasting_toolbox_py.data.loader import load_csv, load_excel, preprocess_transformations, parse_date_column, align_vintages
+from nowcasting_toolbox_py.data.loader import load_csv, load_excel, preprocess_transformations, parse_date_column, align_vintages, AsOfIndex, \
+    apply_transform_codes, invert_transform_codes
 
 
 def test_load_csv(tmp_path):
@@ -47,3 +48,81 @@ def test_align_vintages():
     assert list(pivoted.index) == [pd.Timestamp('2021-01-01'), pd.Timestamp('2021-04-01')]
     assert pd.Timestamp('2021-01-15') in pivoted.columns
     assert pd.Timestamp('2021-04-15') in pivoted.columns
+
+
+def test_vintage_store(tmp_path):
+    from nowcasting_toolbox_py.data.vintage_store import VintageStore
+    data = pd.DataFrame({
+        'date': ['2021-01-01', '2021-01-01', '2021-04-01', '2021-01-01'],
+        'vintage': ['2021-01-15', '2021-04-15', '2021-04-15', '2021-04-15'],
+        'series': ['gdp', 'gdp', 'gdp', 'cpi'],
+        'value': [100, 110, 120, 1.5]
+    })
+    data['date'] = pd.to_datetime(data['date'])
+    data['vintage'] = pd.to_datetime(data['vintage'])
+    store = VintageStore.from_long(str(tmp_path / 'store'), data)
+    assert store.shape == (2, 2, 2)
+    # La historia de una serie coincide con align_vintages
+    gdp = VintageStore(str(tmp_path / 'store')).series_vintages('gdp')
+    expected = align_vintages(data[data['series'] == 'gdp'], 'date', 'vintage')
+    np.testing.assert_array_equal(gdp.values, expected.values)
+    # Añadir un vintage no reescribe los anteriores
+    store.append('2021-07-15', pd.DataFrame({'cpi': [1.6]}, index=[pd.Timestamp('2021-04-01')]))
+    assert store.vintage('2021-07-15').loc['2021-04-01', 'cpi'] == 1.6
+    assert store.vintage('2021-01-15').loc['2021-01-01', 'gdp'] == 100
+    # Las etiquetas de las series se conservan (no se convierten a texto)
+    coded = VintageStore.create(str(tmp_path / 'coded'), pd.date_range('2021-01-01', periods=3, freq='MS'),
+                                np.array([101, 202]))
+    coded.append('2021-04-15', pd.DataFrame({202: [1.0, 2.0]}, index=coded.dates[:2]))
+    reopened = VintageStore(str(tmp_path / 'coded'))
+    assert list(reopened.series) == [101, 202]
+    np.testing.assert_array_equal(reopened.series_vintages(202).values[:, 0], [1.0, 2.0, np.nan])
+
+
+def test_asof_index():
+    data = pd.DataFrame({
+        'date': ['2021-01-01', '2021-01-01', '2021-02-01', '2021-03-01', '2021-03-01'],
+        'vintage': ['2021-02-10', '2021-03-10', '2021-03-10', '2021-04-20', '2021-05-20'],
+        'series': ['ip', 'ip', 'ip', 'gdp', 'gdp'],
+        'value': [1.0, 1.1, 2.0, 0.5, 0.6]
+    })
+    index = AsOfIndex(data, monthly=['ip'], quarterly=['gdp'])
+    x = index.asof('2021-03-15')
+    assert list(x.columns) == ['ip', 'gdp']
+    assert list(x.index) == list(pd.date_range('2021-01-01', '2021-03-01', freq='MS'))
+    np.testing.assert_array_equal(x['ip'].values, [1.1, 2.0, np.nan])
+    assert x['gdp'].isna().all()
+    # Las revisiones sustituyen a la publicación anterior
+    assert index.asof('2021-05-20').loc['2021-03-01', 'gdp'] == 0.6
+    assert index.asof('2021-01-01').isna().all().all()
+
+
+def test_asof_index_month_end_dates():
+    # Fechas de referencia a fin de mes: mismo panel que con fechas a principio de mes
+    data = pd.DataFrame({
+        'date': ['2021-01-31', '2021-02-28', '2021-03-31'],
+        'vintage': ['2021-02-10', '2021-03-10', '2021-04-20'],
+        'series': ['ip', 'ip', 'ip'],
+        'value': [1.0, 2.0, 3.0]
+    })
+    x = AsOfIndex(data, monthly=['ip']).asof('2021-05-01')
+    assert list(x.index) == list(pd.date_range('2021-01-01', '2021-03-01', freq='MS'))
+    np.testing.assert_array_equal(x['ip'].values, [1.0, 2.0, 3.0])
+
+
+def test_transform_codes_roundtrip():
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2015-01-01', periods=36, freq='MS')
+    levels = pd.DataFrame(100 + rng.random((36, 7)).cumsum(axis=0), index=index,
+                          columns=[f'm{c}' for c in range(6)] + ['q0'])
+    levels.loc[index.month % 3 != 0, 'q0'] = np.nan
+    transf_m, transf_q = [0, 1, 2, 3, 4, 6], [5]
+    x = apply_transform_codes(levels.copy(), transf_m, transf_q)
+    np.testing.assert_allclose(x['m1'].values[1:], np.diff(levels['m1'].values))
+    np.testing.assert_allclose(x['m4'].values[1:], 100 * (levels['m4'].values[1:] / levels['m4'].values[:-1] - 1))
+    assert x['q0'].notna().sum() == 8
+    # Reconstrucción de los niveles de los últimos 6 meses
+    known = levels.copy()
+    known.iloc[-6:] = np.nan
+    back = invert_transform_codes(x, transf_m, transf_q, known)
+    pd.testing.assert_frame_equal(back, levels, check_freq=False)
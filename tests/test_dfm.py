@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from nowcasting_toolbox_py.models.dfm import DynamicFactorModel
 import pandas as pd
 
@@ -10,3 +11,64 @@ def test_nowcast_before_fit_raises():
         model.nowcast()
     with pytest.raises(ValueError):
         model.summarize()
+
+
+def test_em_fit_mixed_frequency(mixed_panel):
+    df = mixed_panel
+    model = DynamicFactorModel(endog=df, k_factors=1, factor_order=1,
+                               n_quarterly=1, max_iter=50)
+    model.fit()
+    assert model.results.converged
+    now = model.nowcast()
+    assert now.shape == df.shape
+    assert not now.isna().any().any()
+    # Los datos observados se reproducen aproximadamente
+    obs = df['m0'].notna()
+    assert np.corrcoef(now.loc[obs, 'm0'], df.loc[obs, 'm0'])[0, 1] > 0.9
+
+
+def test_warm_start_from_param_chain(mixed_panel):
+    from nowcasting_toolbox_py.models.dfm import DFMParamChain
+    df = mixed_panel
+    chain = DFMParamChain()
+    old = DynamicFactorModel(endog=df.iloc[:-3], k_factors=1, n_quarterly=1,
+                             max_iter=500, param_chain=chain)
+    old.fit()
+    assert len(chain.params) == 1
+    new = DynamicFactorModel(endog=df, k_factors=1, n_quarterly=1,
+                             max_iter=500, param_chain=chain)
+    new.fit()
+    assert len(chain.params) == 2
+    assert new.results.n_iter < old.results.n_iter
+
+
+def test_update_matches_full_filter(mixed_panel):
+    from nowcasting_toolbox_py.models.kalman import kalman_filter, kalman_smoother
+    df = mixed_panel
+    model = DynamicFactorModel(endog=df, k_factors=1, n_quarterly=1, max_iter=20)
+    model.fit()
+    release = pd.DataFrame({'m0': [0.5, -0.5]}, index=df.index[-2:])
+    revised = model.update(release)
+    assert model.endog.loc[df.index[-1], 'm0'] == -0.5
+    # Mismo resultado que volver a filtrar toda la muestra con parámetros fijos
+    res = model.results
+    x = (model.endog.values - res.Mx) / res.Wx
+    filt = kalman_filter(x, res.C, res.R, res.A, res.Q, res.Z_0, res.V_0)
+    full = kalman_smoother(res.A, filt).Zs @ res.C.T * res.Wx + res.Mx
+    np.testing.assert_allclose(revised.values, full)
+
+
+def test_news_decomposition_adds_up(mixed_panel):
+    from nowcasting_toolbox_py.tools.DFM_News_Mainfile import DFM_News_Mainfile
+    df = mixed_panel
+    model = DynamicFactorModel(endog=df, k_factors=1, n_quarterly=1, max_iter=20)
+    model.fit()
+    old = df.copy()
+    old.iloc[-3:, :5] = np.nan
+    groups = np.array([0, 0, 0, 0, 1, 1, 1, 1, 2])
+    news, = DFM_News_Mainfile(model, old, df, 'gdp', [df.index[-1]], groups, ['a', 'b', 'c'])
+    # La nueva previsión coincide con el suavizado sobre la nueva vintage
+    assert np.isclose(news.y_new, model.nowcast()['gdp'].iloc[-1])
+    assert np.isclose(news.y_new - news.y_old, news.revision + news.news_table['impact'].sum())
+    assert np.isclose(news.impact_by_group.sum(), news.impact_by_series.sum())
+
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from nowcasting_toolbox_py.tools.common_heatmap import common_heatmap
+
+
+def test_common_heatmap_incremental_update():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.standard_normal((60, 9)).cumsum(axis=0),
+                      index=pd.date_range('2015-01-01', periods=60, freq='MS'),
+                      columns=[f"m{i}" for i in range(9)])
+    df.iloc[::3, -1] = np.nan
+    groups = np.array([2, 2, 0, 0, 1, 1, 1, 1, 0])
+    names = list(df.columns)
+    # Vintage anterior: faltan los últimos meses de algunas series
+    old = df.iloc[:-2].copy()
+    old.iloc[-4:, :3] = np.nan
+    new = df.copy()
+    new.iloc[10, 4] += 1.0  # revisión
+    heat = common_heatmap(old, None, groups, ['a', 'b', 'c'], names)
+    heat = common_heatmap(new.iloc[-8:], None, groups, ['a', 'b', 'c'], names, state=heat.state)
+    heat.state.update(new.iloc[[10]])
+    heat = heat.state.heatmap()
+    z = (new - new.mean()) / new.std(ddof=0)
+    z_agg = np.column_stack([z.iloc[:, groups == g].mean(axis=1) for g in range(3)])
+    np.testing.assert_allclose(heat.zscores, z.values)
+    np.testing.assert_allclose(heat.zscores_agg, z_agg)
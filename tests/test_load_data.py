@@ -0,0 +1,49 @@
+import os
+import numpy as np
+import pandas as pd
+
+from nowcasting_toolbox_py.tools.common_load_data import _read_workbook, load_workbook_cached
+
+
+def write_workbook(path, shift=0.0):
+    # Libro de ejemplo con una columna entera y grupos con huecos
+    idx = pd.date_range('2020-01-01', periods=6, freq='MS', name='date')
+    mon = pd.DataFrame({'ip': np.arange(6) + shift, 'emp': [1, 2, 3, 4, 5, 6]}, index=idx)
+    mon.loc[idx[-1], 'ip'] = np.nan
+    quar = pd.DataFrame({'gdp': [np.nan, np.nan, 0.5, np.nan, np.nan, 0.7]}, index=idx)
+    blocks = pd.DataFrame({'series': ['ip', 'emp', 'gdp'], 'block': [1, 1, 2],
+                           'group_name': ['Real', np.nan, 'GDP']})
+    with pd.ExcelWriter(path) as writer:
+        mon.to_excel(writer, sheet_name='Monthly')
+        quar.to_excel(writer, sheet_name='Quarterly')
+        blocks.to_excel(writer, sheet_name='blocks', index=False)
+
+
+def test_cached_load_matches_fresh_load(tmp_path):
+    file = str(tmp_path / 'data.xlsx')
+    write_workbook(file)
+    fresh, nM, blocks = _read_workbook(file, 'Monthly', 'Quarterly', 'blocks')
+    first = load_workbook_cached(file, 'Monthly', 'Quarterly', 'blocks')
+    cached = load_workbook_cached(file, 'Monthly', 'Quarterly', 'blocks')
+    for out in (first, cached):
+        pd.testing.assert_frame_equal(out[0], fresh)
+        assert out[1] == nM
+        pd.testing.assert_frame_equal(out[2], blocks)
+    assert cached[2]['group_name'].isna().tolist() == [False, True, False]
+    assert cached[0]['emp'].dtype == fresh['emp'].dtype
+
+
+def test_cache_invalidated_when_workbook_changes(tmp_path):
+    file = str(tmp_path / 'data.xlsx')
+    other = str(tmp_path / 'data_Example1.xlsx')
+    write_workbook(file)
+    write_workbook(other)
+    load_workbook_cached(other, 'Monthly', 'Quarterly', 'blocks')
+    load_workbook_cached(file, 'Monthly', 'Quarterly', 'blocks')
+    write_workbook(file, shift=10.0)
+    xest = load_workbook_cached(file, 'Monthly', 'Quarterly', 'blocks')[0]
+    assert xest['ip'].iloc[0] == 10.0
+    caches = sorted(os.listdir(tmp_path / '.cache'))
+    # Una caché por libro: la antigua de data.xlsx se borra, la de otro libro no
+    assert len(caches) == 2
+    assert sum(name.startswith('data_Example1_') for name in caches) == 1
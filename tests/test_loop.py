@@ -0,0 +1,84 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from types import SimpleNamespace
+
+from nowcasting_toolbox_py.tools.common_loop import run_model_loop
+
+
+def make_inputs(panel):
+    Par = SimpleNamespace(r=1, p=1, idio=1, thresh=1e-3, max_iter=10, nQ=1)
+    Eval = SimpleNamespace(data_update_lastyear=2009, data_update_lastmonth=12,
+                           eval_startyear=2008, eval_startmonth=4,
+                           eval_endyear=2008, eval_endmonth=6)
+    Loop = SimpleNamespace(n_iter=3, min_startyear=2000, max_startyear=2001, startmonth=1,
+                           min_var=4, max_var=6, min_p=1, max_p=2, min_r=1, max_r=1,
+                           do_random=True)
+    return panel, Par, Eval, Loop
+
+
+def test_loop_serial_matches_parallel(mixed_panel):
+    xest, Par, Eval, Loop = make_inputs(mixed_panel)
+    serial = run_model_loop(xest, Par, Eval, Loop, 'DFM', 3, None, n_workers=1)
+    parallel = run_model_loop(xest, Par, Eval, Loop, 'DFM', 3, None, n_workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_loop_resumes_from_checkpoint(mixed_panel, tmp_path):
+    xest, Par, Eval, Loop = make_inputs(mixed_panel)
+    ckpt = str(tmp_path / 'loop_checkpoint.jsonl')
+    full = run_model_loop(xest, Par, Eval, Loop, 'DFM', 3, None, n_workers=1, checkpoint_file=ckpt)
+    # Interrupción: se conservan la cabecera, un registro (marcado) y una línea a medias
+    with open(ckpt) as f:
+        lines = f.read().splitlines()
+    record = json.loads(lines[1])
+    record['mae_now'] = -1.0
+    with open(ckpt, 'w') as f:
+        f.write(lines[0] + '\n' + json.dumps(record) + '\n' + lines[2][:10])
+    resumed = run_model_loop(xest, Par, Eval, Loop, 'DFM', 3, None, n_workers=1, checkpoint_file=ckpt)
+    assert resumed.loc[record['id'], 'mae_now'] == -1.0
+    pd.testing.assert_frame_equal(resumed.drop(index=record['id']), full.drop(index=record['id']))
+    # Otra ventana de evaluación invalida el checkpoint
+    Eval.eval_endmonth = 5
+    shorter = run_model_loop(xest, Par, Eval, Loop, 'DFM', 3, None, n_workers=1, checkpoint_file=ckpt)
+    assert (shorter['n_vintages'] == 2).all()
+    assert (shorter['mae_now'] != -1.0).all()
+
+
+def test_loop_rejects_models_without_evaluation(mixed_panel):
+    xest, Par, Eval, Loop = make_inputs(mixed_panel)
+    with pytest.raises(NotImplementedError):
+        run_model_loop(xest, Par, Eval, Loop, 'BVAR', 3, None, n_workers=1)
+
+
+def test_successive_halving_matches_full_loop(mixed_panel):
+    from nowcasting_toolbox_py.tools.common_loop import run_successive_halving
+    xest, Par, Eval, Loop = make_inputs(mixed_panel)
+    Eval.eval_startmonth, Eval.eval_endmonth = 1, 9
+    Loop.n_iter = 6
+    full = run_model_loop(xest, Par, Eval, Loop, 'DFM', 3, None, n_workers=1)
+    Loop.do_halving = 3
+    halving = run_successive_halving(xest, Par, Eval, Loop, 'DFM', 3, None, n_workers=1)
+    survivors = halving[halving['n_vintages'] == 9]
+    assert len(survivors) == 2
+    # Los supervivientes llevan la misma puntuación que en el bucle completo
+    cols = ['mae_back', 'mae_now', 'mae_fore', 'rmse_now']
+    pd.testing.assert_frame_equal(survivors[cols], full.loc[survivors.index, cols])
+    assert full['mae_now'].idxmin() in survivors.index
+
+
+def test_eval_pseudo_real_time_workers_and_cleanup(mixed_panel):
+    import os
+    from nowcasting_toolbox_py.tools.common_eval_models import eval_pseudo_real_time
+    xest, Par, Eval, _ = make_inputs(mixed_panel)
+    serial = eval_pseudo_real_time(xest, Par, Eval, 'DFM', 3, None, n_workers=1, chunk_size=2)
+    parallel = eval_pseudo_real_time(xest, Par, Eval, 'DFM', 3, None, n_workers=2, chunk_size=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    # Un error en los workers no deja bloques de memoria compartida
+    before = set(os.listdir('/dev/shm'))
+    broken = SimpleNamespace(**{k: v for k, v in vars(Par).items() if k != 'r'})
+    for n_workers in (1, 2):
+        with pytest.raises(AttributeError):
+            eval_pseudo_real_time(xest, broken, Eval, 'DFM', 3, None, n_workers=n_workers)
+    assert set(os.listdir('/dev/shm')) <= before
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from nowcasting_toolbox_py.evaluation.metrics import ErrorAccumulator, mean_absolute_error
+
+
+def make_eval_rows(n=24, seed=0):
+    rng = np.random.default_rng(seed)
+    out = rng.standard_normal((n, 3))
+    rows = pd.DataFrame({'month_in_quarter': np.tile([1, 2, 3], n // 3)})
+    for col, h, k in zip(('backcast', 'nowcast', 'forecast'), ('back', 'now', 'fore'), range(3)):
+        rows[f'outturn_{h}'] = out[:, k]
+        rows[col] = out[:, k] + 0.3 * (k + 1) * rng.standard_normal(n)
+    rows.loc[0, 'backcast'] = np.nan
+    return rows
+
+
+def test_error_accumulator_matches_batch(tmp_path):
+    rows = make_eval_rows()
+    acc = ErrorAccumulator()
+    acc.update_evaluation(rows.iloc[:10])
+    acc.save(str(tmp_path / 'errors.json'))
+    acc = ErrorAccumulator.load(str(tmp_path / 'errors.json'))
+    acc.update_evaluation(rows.iloc[10:])
+    sub = rows[(rows['month_in_quarter'] == 2)]
+    assert np.isclose(acc.mae().loc['Now', 2], mean_absolute_error(sub['outturn_now'], sub['nowcast']))
+    sub = rows[(rows['month_in_quarter'] == 1)].dropna()
+    assert np.isclose(acc.rmse().loc['Bac', 1], np.sqrt(((sub['backcast'] - sub['outturn_back']) ** 2).mean()))
+    assert acc.n[0, 0] == 7
+    hits = np.sign(sub['backcast']) == np.sign(sub['outturn_back'])
+    assert np.isclose(acc.to_namespace().Bac.fda_1st, hits.mean())
+
+
+def test_metric_cube_matches_series_metrics():
+    from nowcasting_toolbox_py.evaluation.metrics import evaluate_forecasts, metric_cube, theils_u
+    rng = np.random.default_rng(1)
+    y_true = rng.standard_normal((2, 30))
+    y_pred = y_true + 0.2 * rng.standard_normal((3, 4, 2, 30))
+    y_pred[1, 2, 0, :5] = np.nan
+    cube = metric_cube(y_true, y_pred, targets=['gdp', 'ip'])
+    assert cube.shape == (24, 6)
+    valid = ~np.isnan(y_pred[1, 2, 0])
+    t, p = pd.Series(y_true[0, valid]), pd.Series(y_pred[1, 2, 0, valid])
+    row = cube.loc[(1, 2, 'gdp')]
+    assert row['n'] == 25
+    assert np.isclose(row['MAE'], mean_absolute_error(t, p))
+    assert np.isclose(row['Theil_U'], theils_u(t, p))
+    table = evaluate_forecasts(pd.DataFrame(y_true.T, columns=['gdp', 'ip']),
+                               pd.DataFrame(y_pred[0, 0].T, columns=['gdp', 'ip']))
+    assert list(table.columns) == ['MSE', 'RMSE', 'MAE', 'MAPE', 'Theil_U']
+    assert np.isclose(table.loc['ip', 'RMSE'], cube.loc[(0, 0, 'ip'), 'RMSE'])
+
+
+def test_diebold_mariano_and_mcs():
+    from nowcasting_toolbox_py.evaluation.comparison import diebold_mariano, model_confidence_set
+    rng = np.random.default_rng(0)
+    T = 120
+    errors = pd.DataFrame(rng.standard_normal((T, 4)) * [1, 1.05, 2, 2.5], columns=list('abcd'))
+    dm = diebold_mariano(errors, h=1)
+    # One pair by hand (h=1: plain variance of the loss differential)
+    d = errors['c'] ** 2 - errors['a'] ** 2
+    stat = np.sqrt((T - 1) / T) * d.mean() / np.sqrt(d.var(ddof=0) / T)
+    assert np.isclose(dm.stat.loc['c', 'a'], stat)
+    assert np.isclose(dm.stat.loc['a', 'c'], -stat)
+    assert dm.pvalue.loc['c', 'a'] < 0.01
+    mcs = model_confidence_set(errors, alpha=0.1, n_boot=500)
+    assert mcs.index[0] == 'a' and mcs.loc['a', 'mcs_pvalue'] == 1
+    assert not mcs.loc[['c', 'd'], 'included'].any()
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+
+from nowcasting_toolbox_py.tools.DFM_estimate import DFM_estimate
+from nowcasting_toolbox_py.tools.common_range import common_range
+
+
+def test_common_range_density_and_alternatives(mixed_panel):
+    df = mixed_panel
+    future = pd.date_range(df.index[-1], periods=4, freq='MS')[1:]
+    df = pd.concat([df, pd.DataFrame(np.nan, index=future, columns=df.columns)])
+    Par = SimpleNamespace(r=1, p=1, idio=1, thresh=1e-4, max_iter=50, nQ=1)
+    model = DFM_estimate(df, Par)
+    out = common_range(model, df, Par, [future[-1]], alternatives=[{'p': 2}], n_workers=1)
+    np.testing.assert_allclose(out.point.values, model.nowcast()['gdp'].loc[[future[-1]]].values)
+    assert abs(out.density[0.5].iloc[0] - out.point.iloc[0]) < 0.1 * (out.density[0.95] - out.density[0.05]).iloc[0]
+    assert list(out.alternatives.index) == ['p=2']
+    assert (out.range['min'] <= out.point).all() and (out.range['max'] >= out.point).all()
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from nowcasting_toolbox_py.variable_selection.selector import select_by_correlation, select_by_mutual_info, select_by_lasso, rank_variables
+from nowcasting_toolbox_py.variable_selection.selector import select_by_correlation, select_by_mutual_info, select_by_lasso, rank_variables, \
+    correlation_screen, lasso_selection_path, stability_selection
 
 
 def test_select_by_correlation():
@@ -47,3 +48,56 @@ def test_rank_variables():
     df_rank = rank_variables(X, y, methods=['corr'], k=2)
     assert set(df_rank['variable']) == {'a', 'b'}
     assert all(df_rank['method'] == 'corr')
+
+
+def test_correlation_screen_pairwise():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.standard_normal((50, 4)), columns=list('abcd'))
+    X.iloc[:5, 1] = np.nan
+    y = pd.Series(X['a'].values + rng.standard_normal(50), name='gdp')
+    y.iloc[-3:] = np.nan
+    corr = correlation_screen(X, y, shifts=(0, 1))
+    assert list(corr.columns) == [('gdp', 0), ('gdp', 1)]
+    for col in X.columns:
+        # Igual que pandas con observaciones completas por pares
+        assert np.isclose(corr.loc[col, ('gdp', 0)], X[col].corr(y))
+        assert np.isclose(corr.loc[col, ('gdp', 1)], X[col].corr(y.shift(-1)))
+
+
+def test_lasso_selection_path_reuses_grid():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.standard_normal((120, 8)), columns=list('abcdefgh'))
+    y = 2 * X['c'] - X['f'] + 0.5 * rng.standard_normal(120)
+    first = lasso_selection_path(X.iloc[:-1], y.iloc[:-1], n_splits=4)
+    assert first.coef_path.shape == (100, 8) and first.cv_mse.shape == (100, 4)
+    # Las k primeras variables de la ruta son la selección de tamaño k
+    assert list(first.order[:2]) == ['c', 'f']
+    second = lasso_selection_path(X, y, n_splits=4, alphas=first.alphas, n_jobs=2)
+    np.testing.assert_array_equal(second.alphas, first.alphas)
+    assert list(second.order[:2]) == ['c', 'f']
+
+
+def test_lasso_selection_path_imputes_within_folds():
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.standard_normal((100, 4)), columns=list('abcd'))
+    y = X['a'] + 0.5 * rng.standard_normal(100)
+    X.iloc[:10, 0] = np.nan
+    alphas = lasso_selection_path(X, y, n_splits=4).alphas
+    # Cambiar el último tramo (solo validación del último fold) no altera los folds anteriores
+    shifted = X.copy()
+    shifted.iloc[-20:, 0] += 5.0
+    base = lasso_selection_path(X, y, n_splits=4, alphas=alphas)
+    moved = lasso_selection_path(shifted, y, n_splits=4, alphas=alphas)
+    np.testing.assert_allclose(base.cv_mse[:, :3], moved.cv_mse[:, :3])
+    assert not np.allclose(base.cv_mse[:, 3], moved.cv_mse[:, 3])
+
+
+def test_stability_selection():
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.standard_normal((100, 10)), columns=[f'x{i}' for i in range(10)])
+    y = X['x3'] - 0.8 * X['x7'] + 0.3 * rng.standard_normal(100)
+    freq = stability_selection(X, y, methods=['corr', 'lasso'], k=2, n_resamples=40,
+                               block_length=8, n_workers=1)
+    assert set(freq.index[:2]) == {'x3', 'x7'}
+    assert (freq.loc[['x3', 'x7'], 'frequency'] > 0.9).all()
+    assert np.isclose(freq['corr'].sum(), 2)
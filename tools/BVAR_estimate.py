@@ -0,0 +1,42 @@
+import pandas as pd
+
+from nowcasting_toolbox_py.models.bvar import BayesianVARModel
+
+
+def BVAR_estimate(xest: pd.DataFrame, Par) -> BayesianVARModel:
+    """
+    Estimate the conjugate Minnesota BVAR using the toolbox parameters.
+
+    The overall tightness lambda1 is chosen by maximizing the closed-form
+    marginal likelihood; Par.bvar_thresh and Par.bvar_max_iter control that
+    search. If Par.bvar_min_lags and Par.bvar_max_lags are set, the lag
+    order is also selected by marginal likelihood from one set of
+    cross-products (see BayesianVARModel.select_lags). Rows whose lag window
+    is incomplete are left out of the estimation sample, so the panel should
+    be at a common frequency.
+
+    Args:
+        xest: DataFrame of the series to model (target in the last column).
+        Par: namespace of model parameters. Uses bvar_lags, bvar_thresh and
+             bvar_max_iter, and optionally bvar_lambda1, bvar_lambda3, bvar_delta,
+             bvar_min_lags and bvar_max_lags.
+
+    Returns:
+        Fitted BayesianVARModel. Its `results` attribute holds the posterior
+        (intercept, coefs, sigma_u, B, S, nu, lambda1, log_ml).
+    """
+    model = BayesianVARModel(
+        endog=xest,
+        lags=Par.bvar_lags,
+        method='minnesota',
+        lambda1=getattr(Par, 'bvar_lambda1', 0.2),
+        lambda3=getattr(Par, 'bvar_lambda3', 1.0),
+        delta=getattr(Par, 'bvar_delta', 0.0)
+    )
+    max_lags = getattr(Par, 'bvar_max_lags', None)
+    if max_lags is not None:
+        model.select_lags(max_lags, min_lags=getattr(Par, 'bvar_min_lags', 1), optimize=True,
+                          thresh=Par.bvar_thresh, max_iter=Par.bvar_max_iter)
+    else:
+        model.fit(optimize=True, thresh=Par.bvar_thresh, max_iter=Par.bvar_max_iter)
+    return model
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+
+from nowcasting_toolbox_py.models.dfm import DynamicFactorModel
+from nowcasting_toolbox_py.models.kalman import kalman_filter, kalman_smoother, projected_cross_cov
+
+
+def DFM_News_Mainfile(model: DynamicFactorModel,
+                      xest_old: pd.DataFrame,
+                      xest_new: pd.DataFrame,
+                      target: str,
+                      target_dates: list,
+                      groups: np.ndarray = None,
+                      groups_name: list = None) -> list:
+    """
+    News decomposition of the DFM forecast revisions between two data vintages.
+
+    The revision of the target between the old and the new vintage is split
+    into the effect of revised data (values already available in the old
+    vintage) and the news of each new release, i.e. its weight times its
+    unexpected component, following Banbura and Modugno (2014). Both vintages
+    are evaluated with the parameters of `model`. The weights are obtained
+    from the smoothed state covariances and smoother gains of a single
+    smoother run on the revised old vintage, so the cost grows with the
+    number of new releases and not with the size of the panel.
+
+    Args:
+        model: DynamicFactorModel fitted with the EM estimator.
+        xest_old: old vintage, same columns as the model data.
+        xest_new: new vintage, same columns as the model data.
+        target: name of the target series (e.g. GDP).
+        target_dates: dates of the target to decompose (e.g. nowcast and
+                      forecast quarters); must be in the index of the vintages.
+        groups: array of group IDs for each series, to aggregate the news by group.
+        groups_name: list of group names ordered like np.unique(groups).
+
+    Returns:
+        List with one SimpleNamespace per target date, with attributes:
+            target_date: date of the target.
+            y_old, y_new: target forecast under the old and new vintage.
+            revision: effect of data revisions.
+            news_table: DataFrame indexed by (series, date) of new releases with
+                        columns ['actual', 'forecast', 'weight', 'impact'].
+            impact_by_series: Series of total news impact per series.
+            impact_by_group: Series of total news impact per group (if groups given).
+    """
+    res = model.results
+    if res is None or model.method != 'em':
+        raise ValueError("News decomposition requires a DFM fitted with the EM estimator.")
+    columns = model.endog.columns
+    index = xest_old.index.union(xest_new.index)
+    x_old = (xest_old.reindex(index=index, columns=columns).values.astype(float) - res.Mx) / res.Wx
+    x_new = (xest_new.reindex(index=index, columns=columns).values.astype(float) - res.Mx) / res.Wx
+    C, R, A, Q, Z0, V0 = res.C, res.R, res.A, res.Q, res.Z_0, res.V_0
+
+    old_obs = ~np.isnan(x_old)
+    new_obs = ~np.isnan(x_new)
+    # Old information set with revised values
+    x_rev = np.where(old_obs & new_obs, x_new, x_old)
+    smooth_rev = kalman_smoother(A, kalman_filter(x_rev, C, R, A, Q, Z0, V0))
+    if np.array_equal(x_rev[old_obs], x_old[old_obs]):
+        Zs_old = smooth_rev.Zs
+    else:
+        Zs_old = kalman_smoother(A, kalman_filter(x_old, C, R, A, Q, Z0, V0)).Zs
+
+    t_rel, i_rel = np.nonzero(new_obs & ~old_obs)
+    i_y = columns.get_loc(target)
+    t_y = index.get_indexer(pd.DatetimeIndex(target_dates) if isinstance(index, pd.DatetimeIndex)
+                            else pd.Index(target_dates))
+    if (t_y < 0).any():
+        raise ValueError("target_dates must be in the index of the vintages.")
+
+    # Rows of interest: the new releases followed by the targets
+    times = np.concatenate([t_rel, t_y])
+    H = np.vstack([C[i_rel], np.repeat(C[i_y][None, :], len(t_y), axis=0)])
+    Sigma = projected_cross_cov(smooth_rev, H, times)
+    n = len(t_rel)
+    innov = x_new[t_rel, i_rel] - np.einsum('jm,jm->j', C[i_rel], smooth_rev.Zs[t_rel])
+    P = Sigma[:n, :n] + np.diag(R[i_rel])
+    weights = np.linalg.solve(P, Sigma[:n, n:]).T if n else np.zeros((len(t_y), 0))
+
+    scale = res.Wx[i_y]
+    groups_arr = None if groups is None else np.asarray(groups)
+    rel_index = pd.MultiIndex.from_arrays([columns[i_rel], index[t_rel]], names=['series', 'date'])
+    out = []
+    for k, t in enumerate(t_y):
+        y_old = C[i_y] @ Zs_old[t] * scale + res.Mx[i_y]
+        y_rev = C[i_y] @ smooth_rev.Zs[t] * scale + res.Mx[i_y]
+        impact = weights[k] * innov * scale
+        news_table = pd.DataFrame({
+            'actual': x_new[t_rel, i_rel] * res.Wx[i_rel] + res.Mx[i_rel],
+            'forecast': (x_new[t_rel, i_rel] - innov) * res.Wx[i_rel] + res.Mx[i_rel],
+            'weight': weights[k] * scale / res.Wx[i_rel],
+            'impact': impact
+        }, index=rel_index)
+        impact_by_series = pd.Series(0.0, index=columns)
+        np.add.at(impact_by_series.values, i_rel, impact)
+        impact_by_group = None
+        if groups_arr is not None:
+            unique_groups, g_idx = np.unique(groups_arr, return_inverse=True)
+            names = list(groups_name) if groups_name is not None else list(unique_groups)
+            impact_by_group = pd.Series(np.bincount(g_idx[i_rel], weights=impact,
+                                                    minlength=len(unique_groups)), index=names)
+        out.append(SimpleNamespace(target_date=index[t], y_old=y_old,
+                                   y_new=y_rev + impact.sum(), revision=y_rev - y_old,
+                                   news_table=news_table, impact_by_series=impact_by_series,
+                                   impact_by_group=impact_by_group))
+    return out
+
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from nowcasting_toolbox_py.models.dfm import DFMParamChain, DynamicFactorModel
+
+
+def DFM_estimate(xest: pd.DataFrame, Par, param_chain: DFMParamChain = None,
+                 vintage=None) -> DynamicFactorModel:
+    """
+    Estimate the mixed-frequency DFM with the EM algorithm using the toolbox parameters.
+
+    Args:
+        xest: DataFrame with monthly series first and quarterly series last
+              (as returned by common_load_data / common_NaN_Covid_correct).
+        Par: namespace of model parameters. Uses r, p, idio, thresh, max_iter and nQ.
+        param_chain: optional DFMParamChain to warm-start EM from earlier vintages.
+        vintage: date of the data vintage (e.g. date_today) used as chain key.
+
+    Returns:
+        Fitted DynamicFactorModel. Its `results` attribute holds the estimated
+        system (X_sm, F, C, R, A, Q, Z_0, V_0, Mx, Wx, ...).
+    """
+    model = DynamicFactorModel(
+        endog=xest,
+        k_factors=Par.r,
+        factor_order=Par.p,
+        error_order=Par.idio,
+        n_quarterly=getattr(Par, 'nQ', 0),
+        method='em',
+        thresh=Par.thresh,
+        max_iter=Par.max_iter,
+        param_chain=param_chain,
+        vintage=vintage
+    )
+    model.fit()
+    return model
@@ -0,0 +1,300 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+from nowcasting_toolbox_py.models.dfm import DFMParamChain
+from nowcasting_toolbox_py.tools.DFM_estimate import DFM_estimate
+from nowcasting_toolbox_py.tools.common_NaN_Covid_correct import common_NaN_Covid_correct
+
+# Per-process state of the evaluation workers (shared panel and settings)
+_WORKER = {}
+
+
+def common_eval_models(do_loop, Loop, Eval, xest: pd.DataFrame, Par, t_m, m: int, country,
+                       datet: np.ndarray, do_Covid: int, groups: np.ndarray,
+                       n_workers: int = None, chunk_size: int = 6):
+    """
+    Pseudo-real-time evaluation of the selected model.
+
+    For every month between Eval.eval_start and Eval.eval_end a vintage is
+    reconstructed from xest by applying the publication lag of each series
+    observed at the last data update, the model is re-estimated and the
+    backcast, nowcast and forecast of the target (last column of xest) are
+    stored with their outturns. With do_loop, every configuration of the
+    Loop search is evaluated instead (see common_loop.run_model_loop), or
+    searched by successive halving when Loop.do_halving is set.
+
+    Args:
+        do_loop: flag for the loop over models.
+        Loop: namespace of loop parameters; loop results are stored in Loop.results.
+        Eval: namespace of evaluation parameters; results are stored in Eval.results.
+        xest: DataFrame with monthly series first and quarterly series last.
+        Par: namespace of model parameters.
+        t_m: month of the quarter of GDP availability (unused).
+        m: months ahead kept after each vintage date.
+        country: namespace with the model name in country.model.
+        datet: ndarray T x 2 with [year, month] for each row of xest.
+        do_Covid: Covid correction code (see common_NaN_Covid_correct).
+        groups: array of group IDs for each series.
+        n_workers: number of worker processes (default: number of CPUs).
+        chunk_size: number of consecutive vintages per task; fits within a task
+                    are warm-started from the previous vintage.
+
+    Returns:
+        Loop, Eval (Eval.results holds the evaluation DataFrame of a single model).
+    """
+    if do_loop:
+        from nowcasting_toolbox_py.tools.common_loop import run_model_loop, run_successive_halving
+        run_loop = run_successive_halving if getattr(Loop, 'do_halving', False) else run_model_loop
+        Loop.results = run_loop(xest, Par, Eval, Loop, country.model, m, datet, do_Covid,
+                                groups, n_workers=n_workers)
+        return Loop, Eval
+    Eval.results = eval_pseudo_real_time(xest, Par, Eval, country.model, m, datet, do_Covid,
+                                         groups, n_workers=n_workers, chunk_size=chunk_size)
+    return Loop, Eval
+
+
+def eval_pseudo_real_time(xest: pd.DataFrame, Par, Eval, model: str, m: int,
+                          datet: np.ndarray, do_Covid: int = 0, groups: np.ndarray = None,
+                          n_workers: int = None, chunk_size: int = 6) -> pd.DataFrame:
+    """
+    Run the pseudo-real-time evaluation over the vintages of the Eval window.
+
+    Vintages are independent and are evaluated in a process pool. The panel
+    is placed once in shared memory and attached by every worker, instead of
+    being pickled with each task, and results are returned in vintage order
+    whatever the number of workers.
+
+    Args:
+        xest: DataFrame with monthly series first and quarterly series last.
+        Par: namespace of model parameters.
+        Eval: namespace of evaluation parameters.
+        model: 'DFM'; the only model with a pseudo-real-time nowcaster (BEQ and
+               BVAR raise NotImplementedError).
+        m: months ahead kept after each vintage date.
+        datet: ndarray T x 2 with [year, month] for each row of xest.
+        do_Covid: Covid correction code.
+        groups: array of group IDs for each series.
+        n_workers: number of worker processes (default: number of CPUs).
+        chunk_size: number of consecutive vintages per task.
+
+    Returns:
+        DataFrame indexed by vintage with columns ['month_in_quarter', 'backcast',
+        'nowcast', 'forecast', 'outturn_back', 'outturn_now', 'outturn_fore'].
+    """
+    check_model(model, 'eval_pseudo_real_time')
+    vintages = pd.date_range(pd.Timestamp(Eval.eval_startyear, Eval.eval_startmonth, 1),
+                             pd.Timestamp(Eval.eval_endyear, Eval.eval_endmonth, 1), freq='MS')
+    date_today = pd.Timestamp(Eval.data_update_lastyear, Eval.data_update_lastmonth, 1)
+    lags = publication_lags(xest, date_today)
+    tasks = [list(vintages[i:i + chunk_size]) for i in range(0, len(vintages), chunk_size)]
+    n_workers = n_workers or os.cpu_count() or 1
+
+    with shared_panel(xest) as shm_name:
+        initargs = (shm_name, xest.shape, xest.index, xest.columns, lags, Par, model,
+                    m, datet, do_Covid, groups)
+        if n_workers == 1:
+            _init_worker(*initargs)
+            try:
+                records = [_eval_task(task) for task in tasks]
+            finally:
+                _release_worker()
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=initargs) as executor:
+                records = list(executor.map(_eval_task, tasks))
+    rows = [row for task_rows in records for row in task_rows]
+    return pd.DataFrame(rows).set_index('vintage')
+
+
+def check_model(model: str, caller: str) -> None:
+    """
+    Raise NotImplementedError if model has no pseudo-real-time nowcaster.
+
+    Args:
+        model: model name (country.model).
+        caller: name of the calling function, used in the message.
+    """
+    if model not in _NOWCASTERS:
+        raise NotImplementedError(f"{caller}: model {model} not available "
+                                  f"(supported: {', '.join(_NOWCASTERS)}).")
+
+
+@contextmanager
+def shared_panel(xest: pd.DataFrame):
+    """
+    Copy the values of xest to a shared memory block for the worker processes.
+
+    Args:
+        xest: DataFrame to share (stored as float64).
+
+    Yields:
+        Name of the shared memory block, unlinked on exit.
+    """
+    values = np.ascontiguousarray(xest.values, dtype=float)
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=float, buffer=shm.buf)[:] = values
+        yield shm.name
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def attach_panel(shm_name: str, shape: tuple):
+    """
+    Attach a panel placed in shared memory by shared_panel.
+
+    Args:
+        shm_name: name of the shared memory block.
+        shape: shape of the panel.
+
+    Returns:
+        The SharedMemory handle (close it when done) and a float64 ndarray view.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    return shm, np.ndarray(shape, dtype=float, buffer=shm.buf)
+
+
+def publication_lags(xest: pd.DataFrame, date_today) -> np.ndarray:
+    """
+    Months between date_today and the last observation of each series.
+
+    Args:
+        xest: DataFrame with monthly DatetimeIndex.
+        date_today: date of the data update.
+
+    Returns:
+        Integer array with one lag per column.
+    """
+    date_today = pd.Timestamp(date_today)
+    pos_today = int(np.searchsorted(xest.index.values, date_today.to_datetime64(), side='right')) - 1
+    observed = xest.notna().values[:pos_today + 1][::-1]
+    return np.where(observed.any(axis=0), np.argmax(observed, axis=0), 0)
+
+
+def _quarter_end(date: pd.Timestamp) -> pd.Timestamp:
+    """
+    First day of the last month of the quarter containing date.
+    """
+    return pd.Timestamp(date.year, 3 * ((date.month - 1) // 3) + 3, 1)
+
+
+def _init_worker(shm_name, shape, index, columns, lags, Par, model, m, datet, do_Covid, groups):
+    """
+    Attach the shared panel and store the evaluation settings in the worker.
+    """
+    shm, x = attach_panel(shm_name, shape)
+    _WORKER['shm'] = shm
+    _WORKER['ctx'] = evaluation_context(x, index, columns, lags, Par, model, m, datet,
+                                        do_Covid, groups)
+
+
+def _release_worker():
+    """
+    Detach the shared panel in the current process.
+    """
+    _WORKER.pop('ctx', None)
+    shm = _WORKER.pop('shm', None)
+    if shm is not None:
+        shm.close()
+
+
+def _eval_task(vintages: list) -> list:
+    """
+    Evaluate a task of consecutive vintages on the worker's panel.
+    """
+    return evaluate_vintages(_WORKER['ctx'], vintages)
+
+
+def evaluation_context(x: np.ndarray, index, columns, lags: np.ndarray, Par, model: str, m: int,
+                       datet: np.ndarray, do_Covid: int, groups: np.ndarray) -> SimpleNamespace:
+    """
+    Settings of a pseudo-real-time evaluation, as used by evaluate_vintages.
+
+    Args:
+        x: values of the full panel (e.g. the array returned by attach_panel).
+        index, columns: index and columns of the panel.
+        lags: publication lag of each series (see publication_lags).
+        Par: namespace of model parameters.
+        model: model name (see check_model).
+        m: months ahead kept after each vintage date.
+        datet: ndarray T x 2 with [year, month] for each row, or None.
+        do_Covid: Covid correction code.
+        groups: array of group IDs for each series.
+
+    Returns:
+        SimpleNamespace with one attribute per argument.
+    """
+    return SimpleNamespace(x=x, index=index, columns=columns, lags=lags, Par=Par, model=model,
+                           m=m, datet=datet, do_Covid=do_Covid, groups=groups)
+
+
+def evaluate_vintages(ctx: SimpleNamespace, vintages: list, chain: DFMParamChain = None) -> list:
+    """
+    Evaluate consecutive vintages, warm-starting each fit from the previous one.
+
+    Args:
+        ctx: evaluation settings (see evaluation_context).
+        vintages: consecutive vintage dates in the index of the panel.
+        chain: warm-start chain of earlier vintages, extended in place; a new
+               chain is started if None.
+
+    Returns:
+        List with one record per vintage (backcast, nowcast, forecast and outturns).
+    """
+    chain = DFMParamChain() if chain is None else chain
+    return [_eval_vintage(ctx, v, chain) for v in vintages]
+
+
+def _eval_vintage(ctx: SimpleNamespace, vintage: pd.Timestamp, chain: DFMParamChain) -> dict:
+    """
+    Build the vintage, estimate the model and collect the target forecasts.
+    """
+    x, index, lags = ctx.x, ctx.index, ctx.lags
+    pos = index.get_loc(vintage)
+    n_rows = min(pos + ctx.m + 1, len(index))
+    xv = x[:n_rows].copy()
+    available = np.arange(n_rows)[:, None] <= pos - lags[None, :]
+    xv[~available] = np.nan
+    xv = pd.DataFrame(xv, index=index[:n_rows], columns=ctx.columns)
+    if ctx.do_Covid:
+        Par = ctx.Par
+        xv = common_NaN_Covid_correct(xv, ctx.datet[:n_rows], ctx.do_Covid,
+                                      Par.nM, Par.blocks, Par.r, ctx.groups,
+                                      [], [], [], None, None)[0]
+
+    target = _NOWCASTERS[ctx.model](xv, ctx.Par, chain, vintage)
+    outturn = pd.Series(x[:, -1], index=index)
+    q_now = _quarter_end(vintage)
+    q_back = q_now - pd.DateOffset(months=3)
+    q_fore = q_now + pd.DateOffset(months=3)
+    backcast = target.get(q_back, np.nan) if pd.isna(xv.iloc[:, -1].get(q_back, np.nan)) else np.nan
+    return {
+        'vintage': vintage,
+        'month_in_quarter': (vintage.month - 1) % 3 + 1,
+        'backcast': backcast,
+        'nowcast': target.get(q_now, np.nan),
+        'forecast': target.get(q_fore, np.nan),
+        'outturn_back': outturn.get(q_back, np.nan),
+        'outturn_now': outturn.get(q_now, np.nan),
+        'outturn_fore': outturn.get(q_fore, np.nan),
+    }
+
+
+def _nowcast_dfm(xv: pd.DataFrame, Par, chain: DFMParamChain, vintage) -> pd.Series:
+    """
+    Target series predicted by the DFM estimated on one vintage.
+    """
+    model = DFM_estimate(xv, Par, param_chain=chain, vintage=vintage)
+    return model.nowcast().iloc[:, -1]
+
+
+# Model name -> function(vintage panel, Par, param chain, vintage date) -> target Series
+_NOWCASTERS = {
+    'DFM': _nowcast_dfm,
+}
@@ -1,13 +1,15 @@
 import numpy as np
 import pandas as pd
 from types import SimpleNamespace
+from scipy import sparse
 
 
 def common_heatmap(xest: pd.DataFrame,
                    Par,
                    groups: np.ndarray,
                    groups_name: list,
-                   fullnames: list) -> SimpleNamespace:
+                   fullnames: list,
+                   state: 'HeatmapState' = None) -> SimpleNamespace:
     """
     Compute standardized z-scores for each input series and aggregated group-level z-scores.
 
@@ -17,6 +19,8 @@ def common_heatmap(xest: pd.DataFrame,
         groups: array of group IDs for each series (length = number of columns in xest).
         groups_name: list of group names corresponding to each unique group ID.
         fullnames: list of full descriptive names for each series (length = n_series).
+        state: heatmap.state of a previous run; if given, only the cells of xest
+               that are new or revised are absorbed into its running statistics.
 
     Returns:
         SimpleNamespace with attributes:
@@ -24,37 +28,140 @@ def common_heatmap(xest: pd.DataFrame,
             zscores: ndarray of shape (T, N) of standardized series values.
             names_agg: list of group names.
             zscores_agg: ndarray of shape (T, G) of aggregated group z-scores.
+            state: HeatmapState to pass to the next run.
     """
     # Ensure DataFrame columns match groups and fullnames length
     if xest.shape[1] != len(groups) or xest.shape[1] != len(fullnames):
         raise ValueError("Length of 'groups' and 'fullnames' must match number of columns in xest")
 
-    # Compute z-scores for each series
-    zscores_df = (xest - xest.mean()) / xest.std(ddof=0)
-
-    # Prepare output names
-    names = list(fullnames)
-
-    # Aggregate z-scores by group
-    unique_groups = np.unique(groups)
-    G = len(unique_groups)
-    # Map unique_groups to group_name in the same order as groups_name
-    # Assume groups_name is ordered by unique_groups
-    names_agg = list(groups_name)
-    # Initialize DataFrame for aggregated z-scores
-    zscores_agg_df = pd.DataFrame(index=xest.index)
-    for idx, g in enumerate(unique_groups):
-        cols = [i for i, grp in enumerate(groups) if grp == g]
-        if cols:
-            zscores_agg_df[names_agg[idx]] = zscores_df.iloc[:, cols].mean(axis=1)
+    if state is None:
+        state = HeatmapState(xest, groups, groups_name, fullnames)
+    else:
+        state.update(xest)
+    return state.heatmap()
+
+
+class HeatmapState:
+    """
+    Panel and running statistics of the heatmap, updated release by release.
+
+    For each series the count, mean and sum of squared deviations of its
+    observations are kept in the pairwise-merge form of Chan et al., so a
+    release only adds (and, for revisions, removes) the changed cells and the
+    mean and std (ddof=0) are never recomputed over the history. The group
+    aggregate is the mean z-score of the observed series of each group,
+    obtained with one product by a sparse series x group indicator matrix.
+
+    Attributes:
+        values: ndarray (T, N) of the panel.
+        index: index of the panel.
+        columns: Index of the series.
+        n, mean, m2: per-series count, mean and sum of squared deviations.
+        indicator: sparse (N, G) matrix with a one at the group of each series.
+    """
+
+    def __init__(self, xest: pd.DataFrame, groups: np.ndarray, groups_name: list, fullnames: list):
+        self.values = xest.to_numpy(dtype=float, copy=True)
+        self.index = xest.index
+        self.columns = xest.columns
+        self.names = list(fullnames)
+        self.names_agg = list(groups_name)
+        # groups_name is ordered like np.unique(groups)
+        unique_groups, g_idx = np.unique(np.asarray(groups), return_inverse=True)
+        N = len(g_idx)
+        self.indicator = sparse.csr_matrix((np.ones(N), (np.arange(N), g_idx)),
+                                           shape=(N, len(unique_groups)))
+        self.n, self.mean, self.m2 = np.zeros(N), np.zeros(N), np.zeros(N)
+        self._merge(self.values, add=True)
+
+    def _merge(self, block: np.ndarray, add: bool) -> None:
+        """
+        Add or remove the observed (non-NaN) cells of block from the statistics.
+        """
+        mask = ~np.isnan(block)
+        k = mask.sum(axis=0).astype(float)
+        if not k.any():
+            return
+        k_safe = np.maximum(k, 1.0)
+        mean_b = np.where(mask, block, 0.0).sum(axis=0) / k_safe
+        m2_b = (np.where(mask, block - mean_b, 0.0) ** 2).sum(axis=0)
+        n = self.n + k if add else self.n - k
+        n_safe = np.maximum(n, 1.0)
+        if add:
+            delta = mean_b - self.mean
+            mean = self.mean + delta * k / n_safe
+            m2 = self.m2 + m2_b + delta ** 2 * self.n * k / n_safe
         else:
-            zscores_agg_df[names_agg[idx]] = np.nan
-
-    # Build SimpleNamespace
-    heatmap = SimpleNamespace(
-        names=names,
-        zscores=zscores_df.values,
-        names_agg=names_agg,
-        zscores_agg=zscores_agg_df.values
-    )
-    return heatmap
+            mean = (self.n * self.mean - k * mean_b) / n_safe
+            m2 = self.m2 - m2_b - (mean_b - mean) ** 2 * n * k / np.maximum(self.n, 1.0)
+        self.n = n
+        self.mean = np.where(n > 0, mean, 0.0)
+        self.m2 = np.where(n > 0, np.maximum(m2, 0.0), 0.0)
+
+    def update(self, new_obs: pd.DataFrame) -> None:
+        """
+        Absorb a data release into the panel and the statistics.
+
+        Dates not yet in the panel are appended; the cost of the statistics
+        update is proportional to the size of new_obs, not of the panel.
+
+        Args:
+            new_obs: DataFrame with a subset of the series of the panel, e.g. the
+                     latest rows of the new vintage; NaN cells are ignored.
+        """
+        if not new_obs.columns.isin(self.columns).all():
+            raise ValueError("new_obs contains series that are not in the heatmap.")
+        extra = new_obs.index.difference(self.index)
+        if len(extra):
+            index = self.index.append(extra)
+            self.values = np.vstack([self.values, np.full((len(extra), len(self.columns)), np.nan)])
+            if not index.is_monotonic_increasing:
+                order = np.argsort(index, kind='stable')
+                index, self.values = index[order], self.values[order]
+            self.index = index
+        rows = self.index.get_indexer(new_obs.index)
+        cols = self.columns.get_indexer(new_obs.columns)
+        block = self.values[rows]
+        old = block[:, cols]
+        new = new_obs.to_numpy(dtype=float)
+        changed = ~np.isnan(new) & (new != old)
+        removed = np.full_like(block, np.nan)
+        added = np.full_like(block, np.nan)
+        removed[:, cols] = np.where(changed, old, np.nan)
+        added[:, cols] = np.where(changed, new, np.nan)
+        self._merge(removed, add=False)
+        self._merge(added, add=True)
+        block[:, cols] = np.where(changed, new, old)
+        self.values[rows] = block
+
+    def std(self) -> np.ndarray:
+        """
+        Population standard deviation (ddof=0) of each series.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 0, np.sqrt(self.m2 / self.n), np.nan)
+
+    def zscores(self, rows=slice(None)) -> np.ndarray:
+        """
+        Z-scores of the given rows of the panel with the current statistics.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.values[rows] - self.mean) / self.std()
+
+    def aggregate(self, z: np.ndarray) -> np.ndarray:
+        """
+        Mean z-score of the observed series of each group, row by row.
+        """
+        observed = ~np.isnan(z)
+        sums = np.where(observed, z, 0.0) @ self.indicator
+        counts = observed.astype(float) @ self.indicator
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def heatmap(self) -> SimpleNamespace:
+        """
+        Heatmap of the whole panel, in the format of common_heatmap.
+        """
+        z = self.zscores()
+        return SimpleNamespace(names=self.names, zscores=z, names_agg=self.names_agg,
+                               zscores_agg=self.aggregate(z), state=self)
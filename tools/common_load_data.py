@@ -1,3 +1,6 @@
+import hashlib
+import os
+import re
 import pandas as pd
 import numpy as np
 
@@ -11,7 +14,9 @@ def common_load_data(
     m: int,
     do_loop: bool,
     date_today,
-    Loop
+    Loop,
+    use_cache: bool = True,
+    cache_dir: str = None
 ):
     """
     Carga datos de Excel y prepara inputs para estimación.
@@ -26,6 +31,8 @@ def common_load_data(
         do_loop: flag para bucle de modelos.
         date_today: fecha de corte para evaluación o nowcast.
         Loop: namespace de parámetros del bucle.
+        use_cache: si True, reutiliza la caché binaria del libro Excel (ver load_workbook_cached).
+        cache_dir: carpeta de la caché; por defecto '.cache' junto al archivo de datos.
 
     Returns:
         Par: con campos nM, nQ, blocks.
@@ -42,19 +49,18 @@ def common_load_data(
     # Construir ruta con extensión .xlsx si no la tiene
     file_xlsx = excel_datafile if excel_datafile.endswith('.xlsx') else excel_datafile + '.xlsx'
 
-    # Leer datos mensuales y trimestrales
-    df_mon = pd.read_excel(file_xlsx, sheet_name=mon_freq, parse_dates=[0], index_col=0)
-    df_quar = pd.read_excel(file_xlsx, sheet_name=quar_freq, parse_dates=[0], index_col=0)
-
-    # Leer configuración de bloques/grupos
-    df_blocks = pd.read_excel(file_xlsx, sheet_name=blocks_sheet)
-
-    # Concatenar series: primero mensuales luego trimestrales
-    xest = pd.concat([df_mon, df_quar], axis=1)
+    # Leer datos mensuales, trimestrales y configuración de bloques/grupos
+    # (desde la caché binaria si el libro no ha cambiado)
+    if use_cache:
+        xest, nM, df_blocks, datet = load_workbook_cached(file_xlsx, mon_freq, quar_freq,
+                                                          blocks_sheet, cache_dir)
+    else:
+        xest, nM, df_blocks = _read_workbook(file_xlsx, mon_freq, quar_freq, blocks_sheet)
+        datet = None
 
     # Actualizar parámetros de Par
-    Par.nM = df_mon.shape[1]
-    Par.nQ = df_quar.shape[1]
+    Par.nM = nM
+    Par.nQ = xest.shape[1] - nM
     # Bloques: matriz bloques (una fila por serie)
     # Suponemos df_blocks tiene columna 'block'
     blocks = df_blocks['block'].values if 'block' in df_blocks else np.zeros(xest.shape[1], dtype=int)
@@ -67,7 +73,8 @@ def common_load_data(
     groups_name = df_blocks['group_name'].unique().tolist() if 'group_name' in df_blocks else list(np.unique(groups))
 
     # Fechas en formato [year, month]
-    datet = np.vstack([xest.index.year, xest.index.month]).T
+    if datet is None:
+        datet = np.vstack([xest.index.year, xest.index.month]).T
 
     # t_m: mes del trimestre de GDP availability
     t_m = m  # por defecto m meses ahead
@@ -75,3 +82,110 @@ def common_load_data(
     # Actualizar Loop.name_loop si do_loop == 2 ya se hace en main
 
     return Par, xest, t_m, groups, nameseries, blocks, groups_name, fullnames, datet, Loop
+
+
+def _read_workbook(file_xlsx: str, mon_freq: str, quar_freq: str, blocks_sheet: str):
+    """
+    Lee las tres hojas del libro Excel.
+
+    Returns:
+        xest: DataFrame con series mensuales seguidas de trimestrales.
+        nM: número de series mensuales.
+        df_blocks: DataFrame de la hoja de bloques/grupos.
+    """
+    df_mon = pd.read_excel(file_xlsx, sheet_name=mon_freq, parse_dates=[0], index_col=0)
+    df_quar = pd.read_excel(file_xlsx, sheet_name=quar_freq, parse_dates=[0], index_col=0)
+    df_blocks = pd.read_excel(file_xlsx, sheet_name=blocks_sheet)
+    # Concatenar series: primero mensuales luego trimestrales
+    xest = pd.concat([df_mon, df_quar], axis=1)
+    return xest, df_mon.shape[1], df_blocks
+
+
+def load_workbook_cached(file_xlsx: str, mon_freq: str, quar_freq: str, blocks_sheet: str,
+                         cache_dir: str = None):
+    """
+    Lee el libro Excel a través de una caché binaria en formato columnar (.npz).
+
+    La caché se identifica por el hash SHA-256 del contenido del libro y los
+    nombres de las hojas: si el archivo cambia, se vuelve a leer con
+    pd.read_excel y se reconstruye la caché (borrando la anterior); si no,
+    se carga directamente desde disco sin pasar por openpyxl.
+
+    Args:
+        file_xlsx: ruta al libro .xlsx.
+        mon_freq: hoja de datos mensuales.
+        quar_freq: hoja de datos trimestrales.
+        blocks_sheet: hoja de bloques y grupos.
+        cache_dir: carpeta de la caché; por defecto '.cache' junto al libro.
+
+    Returns:
+        xest: DataFrame con series mensuales seguidas de trimestrales.
+        nM: número de series mensuales.
+        df_blocks: DataFrame de la hoja de bloques/grupos.
+        datet: ndarray T x 2 con [year, month].
+    """
+    with open(file_xlsx, 'rb') as f:
+        digest = hashlib.sha256(f.read())
+    digest.update('|'.join([mon_freq, quar_freq, blocks_sheet]).encode())
+    key = digest.hexdigest()[:20]
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_xlsx)), '.cache')
+    stem = os.path.splitext(os.path.basename(file_xlsx))[0]
+    cache_file = os.path.join(cache_dir, f"{stem}_{key}.npz")
+
+    if os.path.exists(cache_file):
+        with np.load(cache_file, allow_pickle=False) as z:
+            index_name = z['index_name'][0] if len(z['index_name']) else None
+            xest = pd.DataFrame(z['values'], index=pd.DatetimeIndex(z['index'], name=index_name),
+                                columns=z['columns'].tolist())
+            dtypes = dict(zip(xest.columns, z['dtypes'].tolist()))
+            xest = xest.astype({c: d for c, d in dtypes.items() if d != 'float64'})
+            block_cols = z['block_columns'].tolist()
+            df_blocks = pd.DataFrame({c: _load_block_column(z, i) for i, c in enumerate(block_cols)})
+            return xest, int(z['nM']), df_blocks, z['datet']
+
+    xest, nM, df_blocks = _read_workbook(file_xlsx, mon_freq, quar_freq, blocks_sheet)
+    datet = np.vstack([xest.index.year, xest.index.month]).T
+    arrays = {
+        'values': xest.values.astype(float),
+        'dtypes': np.array([str(d) for d in xest.dtypes]),
+        'index': xest.index.values,
+        'index_name': np.array([] if xest.index.name is None else [str(xest.index.name)]),
+        'columns': np.array([str(c) for c in xest.columns]),
+        'nM': np.array(nM),
+        'datet': datet,
+        'block_columns': np.array([str(c) for c in df_blocks.columns]),
+    }
+    for i, c in enumerate(df_blocks.columns):
+        col = df_blocks[c]
+        if col.dtype.kind in 'biuf':
+            arrays[f'block_{i}'] = col.to_numpy()
+        else:
+            # Texto con máscara de NaN (sin pickle)
+            missing = col.isna().to_numpy()
+            arrays[f'block_{i}'] = np.asarray(col.where(~missing, '').astype(str), dtype=str)
+            arrays[f'block_{i}_na'] = missing
+
+    # Escritura atómica y limpieza de cachés anteriores del mismo libro
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = cache_file[:-len('.npz')] + f'.{os.getpid()}.tmp.npz'
+    np.savez(tmp_file, **arrays)
+    os.replace(tmp_file, cache_file)
+    pattern = re.compile(re.escape(stem) + r'_[0-9a-f]{20}\.npz')
+    for name in os.listdir(cache_dir):
+        if pattern.fullmatch(name) and os.path.join(cache_dir, name) != cache_file:
+            os.remove(os.path.join(cache_dir, name))
+    return xest, nM, df_blocks, datet
+
+
+def _load_block_column(z, i: int) -> np.ndarray:
+    """
+    Columna i de la hoja de bloques guardada en la caché, con NaN restaurados.
+    """
+    values = z[f'block_{i}']
+    if f'block_{i}_na' not in z:
+        return values
+    values = values.astype(object)
+    values[z[f'block_{i}_na']] = np.nan
+    return values
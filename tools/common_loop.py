@@ -0,0 +1,464 @@
+import copy
+import hashlib
+import itertools
+import json
+import math
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from types import SimpleNamespace
+
+from nowcasting_toolbox_py.evaluation.metrics import mean_absolute_error, root_mean_squared_error
+from nowcasting_toolbox_py.models.dfm import DFMParamChain
+from nowcasting_toolbox_py.tools.common_eval_models import (attach_panel, check_model,
+                                                            evaluate_vintages, evaluation_context,
+                                                            publication_lags, shared_panel)
+
+# Model hyper-parameters searched by the loop: (Par field, Loop minimum, Loop maximum),
+# for the models with a pseudo-real-time nowcaster (see common_eval_models.check_model)
+LOOP_PARAMS = {
+    'DFM': [('p', 'min_p', 'max_p'), ('r', 'min_r', 'max_r')],
+}
+
+HORIZONS = ('back', 'now', 'fore')
+
+# Per-process state of the loop workers (shared panel and evaluation settings)
+_LOOP = {}
+
+# Default length of the first rung of successive halving: one year of vintages,
+# so every month of the quarter is scored four times before any elimination
+HALVING_MIN_VINTAGES = 12
+
+
+def loop_configurations(Loop, model: str, seed: int = 0) -> list:
+    """
+    List the model configurations searched by the loop.
+
+    The grid spans the start year, the number of monthly variables and the
+    model hyper-parameters in LOOP_PARAMS. With Loop.do_random, Loop.n_iter
+    configurations are drawn from the grid without replacement. Each
+    configuration gets its own seed spawned from `seed`, so its random
+    choices (e.g. the subset of variables) do not depend on which worker
+    evaluates it or in which order.
+
+    Args:
+        Loop: namespace of loop parameters.
+        model: model name, a key of LOOP_PARAMS ('DFM').
+        seed: root seed of the loop.
+
+    Returns:
+        List of dicts with keys 'id', 'seed', 'startyear', 'startmonth',
+        'n_var' and the model hyper-parameters.
+    """
+    check_model(model, 'loop_configurations')
+    names = ['startyear', 'n_var'] + [name for name, _, _ in LOOP_PARAMS[model]]
+    axes = [range(Loop.min_startyear, Loop.max_startyear + 1),
+            range(Loop.min_var, Loop.max_var + 1)]
+    axes += [range(getattr(Loop, lo), getattr(Loop, hi) + 1) for _, lo, hi in LOOP_PARAMS[model]]
+    grid = list(itertools.product(*axes))
+
+    root = np.random.SeedSequence(seed)
+    if Loop.do_random:
+        rng = np.random.default_rng(root)
+        picks = rng.choice(len(grid), size=min(Loop.n_iter, len(grid)), replace=False)
+        grid = [grid[i] for i in picks]
+    seeds = [int(child.generate_state(1)[0]) for child in root.spawn(len(grid))]
+    return [dict(id=k, seed=seeds[k], startmonth=Loop.startmonth,
+                 **{name: int(v) for name, v in zip(names, combo)})
+            for k, combo in enumerate(grid)]
+
+
+def run_model_loop(xest: pd.DataFrame, Par, Eval, Loop, model: str, m: int, datet: np.ndarray,
+                   do_Covid: int = 0, groups: np.ndarray = None, n_workers: int = None,
+                   seed: int = 0, checkpoint_file: str = None) -> pd.DataFrame:
+    """
+    Evaluate every loop configuration in pseudo-real time, in parallel and resumably.
+
+    Configurations are spread over a process pool sharing xest through shared
+    memory. Each finished configuration is appended to a checkpoint file as
+    soon as it completes; configurations already in the checkpoint are not
+    evaluated again, so an interrupted loop resumes where it stopped. The
+    checkpoint header holds a hash of the panel, the Eval window, the base
+    Par, m, do_Covid and the model; a checkpoint written for other inputs is
+    ignored and overwritten.
+
+    Args:
+        xest: DataFrame with monthly series first and quarterly series last.
+        Par: namespace of model parameters (base values; loop fields are overridden).
+        Eval: namespace of evaluation parameters.
+        Loop: namespace of loop parameters.
+        model: 'DFM' (the only model with a pseudo-real-time evaluation).
+        m: months ahead kept after each vintage date.
+        datet: ndarray T x 2 with [year, month] for each row of xest, or None.
+        do_Covid: Covid correction code.
+        groups: array of group IDs for each series.
+        n_workers: number of worker processes (default: number of CPUs).
+        seed: root seed of the loop.
+        checkpoint_file: JSON-lines checkpoint; defaults to Loop.excel_loopfile
+                         with suffix '_checkpoint.jsonl'.
+
+    Returns:
+        DataFrame indexed by configuration id with the configuration and the
+        MAE/RMSE of the backcast, nowcast and forecast. Also written to
+        Loop.excel_loopfile when set.
+    """
+    check_model(model, 'run_model_loop')
+    configs = loop_configurations(Loop, model, seed)
+    excel_loopfile = getattr(Loop, 'excel_loopfile', None)
+    if checkpoint_file is None and excel_loopfile:
+        checkpoint_file = os.path.splitext(excel_loopfile)[0] + '_checkpoint.jsonl'
+    key = checkpoint_key(xest, Par, Eval, model, m, do_Covid, groups)
+    done = _read_checkpoint(checkpoint_file, configs, key)
+    pending = [c for c in configs if c['id'] not in done]
+
+    vintages = list(pd.date_range(pd.Timestamp(Eval.eval_startyear, Eval.eval_startmonth, 1),
+                                  pd.Timestamp(Eval.eval_endyear, Eval.eval_endmonth, 1), freq='MS'))
+    date_today = pd.Timestamp(Eval.data_update_lastyear, Eval.data_update_lastmonth, 1)
+    lags = publication_lags(xest, date_today)
+    n_workers = n_workers or os.cpu_count() or 1
+
+    if pending:
+        if checkpoint_file:
+            os.makedirs(os.path.dirname(os.path.abspath(checkpoint_file)), exist_ok=True)
+            if not done:
+                with open(checkpoint_file, 'w') as f:
+                    f.write(json.dumps({'key': key}) + '\n')
+        with shared_panel(xest) as shm_name:
+            initargs = (shm_name, xest.shape, xest.index, xest.columns, lags, Par, model,
+                        m, datet, do_Covid, groups)
+            if n_workers == 1:
+                _init_loop_worker(*initargs)
+                try:
+                    for config in pending:
+                        done[config['id']] = _checkpoint(checkpoint_file,
+                                                         _loop_task(config, vintages))
+                finally:
+                    _release_loop_worker()
+            else:
+                with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_loop_worker,
+                                         initargs=initargs) as executor:
+                    futures = [executor.submit(_loop_task, c, vintages) for c in pending]
+                    for future in as_completed(futures):
+                        record = _checkpoint(checkpoint_file, future.result())
+                        done[record['id']] = record
+
+    results = pd.DataFrame([done[c['id']] for c in configs]).set_index('id')
+    if excel_loopfile:
+        os.makedirs(os.path.dirname(os.path.abspath(excel_loopfile)), exist_ok=True)
+        results.to_excel(excel_loopfile)
+    return results
+
+
+def run_successive_halving(xest: pd.DataFrame, Par, Eval, Loop, model: str, m: int,
+                           datet: np.ndarray, do_Covid: int = 0, groups: np.ndarray = None,
+                           n_workers: int = None, seed: int = 0, eta: int = None,
+                           min_vintages: int = None, metric: str = None) -> pd.DataFrame:
+    """
+    Loop search with successive halving over the evaluation window.
+
+    All configurations are first evaluated on the first `min_vintages`
+    vintages of the Eval window. The best 1/eta by `metric` survive and the
+    window is lengthened by a factor eta, until the survivors are evaluated
+    on the full Eval period. Vintages already evaluated for a configuration
+    are kept, and its warm-start chain is carried over, so each rung only fits
+    the new vintages and the full-window scores equal those of run_model_loop.
+
+    Halving is a heuristic: a configuration that is best on the full window
+    can be eliminated if it ranks poorly on the first rung. A longer first
+    window makes this less likely at a higher cost.
+
+    The settings are taken, in order of priority, from the arguments, from
+    Loop.do_halving (an int is the first-rung window; a dict may hold
+    'min_vintages', 'eta' and 'metric') and from the defaults
+    (HALVING_MIN_VINTAGES, eta=3, 'mae_now').
+
+    Args:
+        xest: DataFrame with monthly series first and quarterly series last.
+        Par: namespace of model parameters (base values; loop fields are overridden).
+        Eval: namespace of evaluation parameters.
+        Loop: namespace of loop parameters.
+        model: 'DFM' (the only model with a pseudo-real-time evaluation).
+        m: months ahead kept after each vintage date.
+        datet: ndarray T x 2 with [year, month] for each row of xest, or None.
+        do_Covid: Covid correction code.
+        groups: array of group IDs for each series.
+        n_workers: number of worker processes (default: number of CPUs).
+        seed: root seed of the loop.
+        eta: reduction factor between rungs.
+        min_vintages: length of the first evaluation window.
+        metric: score used to rank configurations (lower is better).
+
+    Returns:
+        DataFrame indexed by configuration id with the configuration, the last
+        rung it reached, the number of vintages evaluated and its scores, sorted
+        with the full-window survivors first by `metric`. Also written to
+        Loop.excel_loopfile when set.
+    """
+    check_model(model, 'run_successive_halving')
+    settings = getattr(Loop, 'do_halving', None)
+    if isinstance(settings, dict):
+        settings = dict(settings)
+    elif isinstance(settings, (int, np.integer)) and not isinstance(settings, bool):
+        settings = {'min_vintages': int(settings)}
+    else:
+        settings = {}
+    eta = eta or settings.get('eta', 3)
+    min_vintages = min_vintages or settings.get('min_vintages', HALVING_MIN_VINTAGES)
+    metric = metric or settings.get('metric', 'mae_now')
+    if eta < 2:
+        raise ValueError("run_successive_halving: eta must be at least 2.")
+
+    configs = loop_configurations(Loop, model, seed)
+    vintages = list(pd.date_range(pd.Timestamp(Eval.eval_startyear, Eval.eval_startmonth, 1),
+                                  pd.Timestamp(Eval.eval_endyear, Eval.eval_endmonth, 1), freq='MS'))
+    date_today = pd.Timestamp(Eval.data_update_lastyear, Eval.data_update_lastmonth, 1)
+    lags = publication_lags(xest, date_today)
+    n_workers = n_workers or os.cpu_count() or 1
+
+    windows = []
+    n_window = max(1, min_vintages)
+    while n_window < len(vintages):
+        windows.append(n_window)
+        n_window *= eta
+    windows.append(len(vintages))
+
+    rows = {c['id']: [] for c in configs}
+    chains = {c['id']: None for c in configs}
+    records = {}
+    alive = configs
+    with shared_panel(xest) as shm_name:
+        initargs = (shm_name, xest.shape, xest.index, xest.columns, lags, Par, model,
+                    m, datet, do_Covid, groups)
+        if n_workers == 1:
+            _init_loop_worker(*initargs)
+            executor = None
+            run = map
+        else:
+            executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_loop_worker,
+                                           initargs=initargs)
+            run = executor.map
+        try:
+            for rung, n_window in enumerate(windows):
+                blocks = [vintages[len(rows[c['id']]):n_window] for c in alive]
+                outputs = run(_halving_task, alive, blocks, [chains[c['id']] for c in alive])
+                for config, (new_rows, variables, chain) in zip(alive, outputs):
+                    rows[config['id']].extend(new_rows)
+                    chains[config['id']] = chain
+                    records[config['id']] = dict(config, rung=rung, variables=variables,
+                                                 **score_evaluation(rows[config['id']]))
+                if rung == len(windows) - 1:
+                    break
+                n_keep = max(1, math.ceil(len(alive) / eta))
+                alive = sorted(alive, key=lambda c: _rank_key(records[c['id']], metric))[:n_keep]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            else:
+                _release_loop_worker()
+
+    results = pd.DataFrame([records[c['id']] for c in configs]).set_index('id')
+    results = results.iloc[sorted(range(len(results)),
+                                  key=lambda i: (-results['rung'].iloc[i],
+                                                 _rank_key(results.iloc[i], metric)))]
+    excel_loopfile = getattr(Loop, 'excel_loopfile', None)
+    if excel_loopfile:
+        os.makedirs(os.path.dirname(os.path.abspath(excel_loopfile)), exist_ok=True)
+        results.to_excel(excel_loopfile)
+    return results
+
+
+def _rank_key(record, metric: str):
+    """
+    Sort key putting missing scores last.
+    """
+    score = record[metric]
+    return (np.isnan(score), score)
+
+
+def checkpoint_key(xest: pd.DataFrame, Par, Eval, model: str, m: int, do_Covid: int,
+                   groups: np.ndarray = None) -> str:
+    """
+    Hash of the inputs that determine the scores of a loop configuration.
+
+    Args:
+        xest: panel evaluated by the loop.
+        Par: namespace of base model parameters.
+        Eval: namespace of evaluation parameters.
+        model: model name.
+        m: months ahead kept after each vintage date.
+        do_Covid: Covid correction code.
+        groups: array of group IDs for each series.
+
+    Returns:
+        Hexadecimal SHA-256 digest.
+    """
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(xest.values, dtype=float).tobytes())
+    settings = {'index': [str(d) for d in xest.index], 'columns': [str(c) for c in xest.columns],
+                'Par': vars(Par), 'Eval': {k: v for k, v in vars(Eval).items() if k != 'results'},
+                'model': model, 'm': m, 'do_Covid': do_Covid, 'groups': groups}
+    h.update(json.dumps(settings, sort_keys=True, default=_jsonable).encode())
+    return h.hexdigest()
+
+
+def _jsonable(value):
+    """
+    JSON representation of numpy values and other objects for checkpoint_key.
+    """
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    if isinstance(value, SimpleNamespace):
+        return vars(value)
+    return repr(value)
+
+
+def _read_checkpoint(checkpoint_file: str, configs: list, key: str) -> dict:
+    """
+    Records of the checkpoint whose configuration is still part of the loop.
+
+    Returns no records when the header of the checkpoint does not match key.
+    """
+    done = {}
+    if not checkpoint_file or not os.path.exists(checkpoint_file):
+        return done
+    by_id = {c['id']: c for c in configs}
+    with open(checkpoint_file) as f:
+        content = f.read()
+    if content and not content.endswith('\n'):
+        # Drop the partial record left by an interrupted write
+        content = content[:content.rfind('\n') + 1]
+        with open(checkpoint_file, 'w') as f:
+            f.write(content)
+    lines = content.splitlines()
+    try:
+        header = json.loads(lines[0]) if lines else {}
+    except json.JSONDecodeError:
+        header = {}
+    if header.get('key') != key:
+        return done
+    for line in lines[1:]:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        config = by_id.get(record.get('id'))
+        if config is not None and all(record.get(k) == v for k, v in config.items()):
+            done[config['id']] = record
+    return done
+
+
+def _checkpoint(checkpoint_file: str, record: dict) -> dict:
+    """
+    Append a finished configuration to the checkpoint file.
+    """
+    if checkpoint_file:
+        with open(checkpoint_file, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    return record
+
+
+def _init_loop_worker(shm_name, shape, index, columns, lags, Par, model, m, datet, do_Covid,
+                      groups):
+    """
+    Attach the shared panel and store the evaluation settings in the worker.
+    """
+    shm, x = attach_panel(shm_name, shape)
+    _LOOP['shm'] = shm
+    _LOOP['ctx'] = evaluation_context(x, index, columns, lags, Par, model, m, datet, do_Covid,
+                                      groups)
+
+
+def _release_loop_worker():
+    """
+    Detach the shared panel in the current process.
+    """
+    _LOOP.pop('ctx', None)
+    shm = _LOOP.pop('shm', None)
+    if shm is not None:
+        shm.close()
+
+
+def configuration_context(ctx: SimpleNamespace, config: dict) -> SimpleNamespace:
+    """
+    Restrict the worker panel and parameters to one loop configuration.
+
+    Args:
+        ctx: evaluation context of the worker (full panel and base Par).
+        config: configuration from loop_configurations.
+
+    Returns:
+        Evaluation context with the sample starting at the configuration start
+        date, a random subset of n_var monthly series (drawn from the
+        configuration seed) plus all quarterly series, and Par updated.
+    """
+    rng = np.random.default_rng(config['seed'])
+    N = len(ctx.columns)
+    nQ = getattr(ctx.Par, 'nQ', 0)
+    nM = N - nQ
+    monthly = np.sort(rng.choice(nM, size=min(config['n_var'], nM), replace=False))
+    cols = np.concatenate([monthly, np.arange(nM, N)])
+    row0 = ctx.index.searchsorted(pd.Timestamp(config['startyear'], config['startmonth'], 1))
+
+    Par = copy.copy(ctx.Par)
+    Par.nM = len(monthly)
+    Par.startyear, Par.startmonth = config['startyear'], config['startmonth']
+    if getattr(Par, 'blocks', None) is not None and len(Par.blocks) == N:
+        Par.blocks = np.asarray(Par.blocks)[cols]
+    for name, _, _ in LOOP_PARAMS[ctx.model]:
+        setattr(Par, name, config[name])
+    groups = None if ctx.groups is None else np.asarray(ctx.groups)[cols]
+    return SimpleNamespace(x=ctx.x[row0:, cols], index=ctx.index[row0:], columns=ctx.columns[cols],
+                           lags=ctx.lags[cols], Par=Par, model=ctx.model, m=ctx.m,
+                           datet=None if ctx.datet is None else ctx.datet[row0:], do_Covid=ctx.do_Covid, groups=groups)
+
+
+def score_evaluation(rows: list) -> dict:
+    """
+    MAE and RMSE of the backcast, nowcast and forecast over the evaluated vintages.
+
+    Args:
+        rows: records returned by the vintage evaluation.
+
+    Returns:
+        dict with keys 'mae_back', 'rmse_back', 'mae_now', ... and 'n_vintages'.
+    """
+    df = pd.DataFrame(rows)
+    scores = {'n_vintages': len(df)}
+    for h, col in zip(HORIZONS, ('backcast', 'nowcast', 'forecast')):
+        valid = df[col].notna() & df[f'outturn_{h}'].notna()
+        true, pred = df.loc[valid, f'outturn_{h}'], df.loc[valid, col]
+        scores[f'mae_{h}'] = float(mean_absolute_error(true, pred)) if valid.any() else np.nan
+        scores[f'rmse_{h}'] = float(root_mean_squared_error(true, pred)) if valid.any() else np.nan
+    return scores
+
+
+def _loop_task(config: dict, vintages: list) -> dict:
+    """
+    Evaluate one configuration on the worker's shared panel.
+    """
+    ctx = configuration_context(_LOOP['ctx'], config)
+    rows = evaluate_vintages(ctx, vintages)
+    record = dict(config)
+    record['variables'] = ';'.join(map(str, ctx.columns))
+    record.update(score_evaluation(rows))
+    return record
+
+
+def _halving_task(config: dict, vintages: list, chain: DFMParamChain = None) -> tuple:
+    """
+    Evaluate one configuration on new vintages, continuing its warm-start chain.
+
+    Returns the rows, its variables and the chain reduced to its latest
+    vintage (the only one later fits start from).
+    """
+    ctx = configuration_context(_LOOP['ctx'], config)
+    chain = DFMParamChain() if chain is None else chain
+    rows = evaluate_vintages(ctx, vintages, chain)
+    last = DFMParamChain()
+    if chain.params:
+        latest = max(chain.params)
+        last.params[latest] = chain.params[latest]
+    return rows, ';'.join(map(str, ctx.columns)), last
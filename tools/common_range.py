@@ -0,0 +1,154 @@
+import copy
+import itertools
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+from nowcasting_toolbox_py.models.dfm import DynamicFactorModel
+from nowcasting_toolbox_py.models.kalman import projected_cross_cov
+from nowcasting_toolbox_py.tools.DFM_estimate import DFM_estimate
+from nowcasting_toolbox_py.tools.common_eval_models import attach_panel, shared_panel
+
+# Per-process state of the range workers (shared panel and settings)
+_RANGE = {}
+
+
+def common_range(model: DynamicFactorModel, xest: pd.DataFrame, Par, target_dates: list,
+                 alternatives: list = None, n_draws: int = 5000,
+                 quantiles=(0.05, 0.16, 0.5, 0.84, 0.95), seed: int = 0,
+                 n_workers: int = None) -> SimpleNamespace:
+    """
+    Range of the target nowcasts from the predictive density and alternative models.
+
+    The density comes from the fitted state-space model: the target at the
+    target dates is jointly Gaussian given the data, with mean C_y Zs_t and
+    covariances C_y Cov(s_t, s_u) C_y' (plus the measurement noise), taken
+    from the smoother as in the news decomposition. All draws are generated
+    with one matrix product. The alternative specifications are re-estimated
+    on the same panel in a process pool, with the panel in shared memory.
+
+    Args:
+        model: DynamicFactorModel fitted with the EM estimator on xest.
+        xest: DataFrame with monthly series first and quarterly series last
+              (target in the last column).
+        Par: namespace of model parameters of the main model.
+        target_dates: dates of the target (e.g. nowcast and forecast quarters).
+        alternatives: list of dicts of Par overrides (e.g. {'r': 3, 'p': 1});
+                      default: the neighbours of Par.r and Par.p (see range_alternatives).
+        n_draws: number of draws of the predictive density.
+        quantiles: quantiles of the density to report.
+        seed: seed of the draws.
+        n_workers: number of worker processes (default: number of CPUs).
+
+    Returns:
+        SimpleNamespace with:
+            point: Series of target nowcasts of the main model.
+            density: DataFrame (target dates x quantiles).
+            alternatives: DataFrame (alternative x target dates) of nowcasts.
+            range: DataFrame (target dates x ['min', 'max']) over the main
+                   model and the alternatives.
+    """
+    res = model.results
+    if res is None or model.method != 'em':
+        raise ValueError("Ranges require a DFM fitted with the EM estimator.")
+    index = model.endog.index
+    t_y = index.get_indexer(pd.DatetimeIndex(target_dates))
+    if (t_y < 0).any():
+        raise ValueError("target_dates must be in the index of the model data.")
+    target_dates = index[t_y]
+    i_y = model.endog.shape[1] - 1
+
+    # Joint predictive density of the target at the target dates
+    H = np.repeat(res.C[i_y][None, :], len(t_y), axis=0)
+    cov = projected_cross_cov(res.smooth, H, t_y) + res.R[i_y] * np.eye(len(t_y))
+    mean = res.smooth.Zs[t_y] @ res.C[i_y]
+    eigval, eigvec = np.linalg.eigh(cov)
+    factor = eigvec * np.sqrt(np.clip(eigval, 0, None))
+    z = np.random.default_rng(seed).standard_normal((len(t_y), n_draws))
+    draws = (mean[:, None] + factor @ z) * res.Wx[i_y] + res.Mx[i_y]
+    density = pd.DataFrame(np.quantile(draws, quantiles, axis=1).T, index=target_dates,
+                           columns=list(quantiles))
+    point = pd.Series(mean * res.Wx[i_y] + res.Mx[i_y], index=target_dates)
+
+    if alternatives is None:
+        alternatives = range_alternatives(Par)
+    alt = _run_alternatives(xest, Par, alternatives, target_dates, n_workers)
+    alt_table = pd.DataFrame(alt, index=[_label(a) for a in alternatives], columns=target_dates)
+    all_points = pd.concat([point.to_frame().T, alt_table])
+    range_ = pd.DataFrame({'min': all_points.min(), 'max': all_points.max()})
+    return SimpleNamespace(point=point, density=density, alternatives=alt_table, range=range_)
+
+
+def range_alternatives(Par) -> list:
+    """
+    Specifications next to the main one: r and p within one of Par.r and Par.p.
+
+    Returns:
+        List of dicts of Par overrides, excluding the main specification.
+    """
+    combos = itertools.product(range(max(1, Par.r - 1), Par.r + 2),
+                               range(max(1, Par.p - 1), Par.p + 2))
+    return [{'r': r, 'p': p} for r, p in combos if (r, p) != (Par.r, Par.p)]
+
+
+def _label(overrides: dict) -> str:
+    """
+    Name of an alternative specification.
+    """
+    return ', '.join(f"{k}={v}" for k, v in overrides.items())
+
+
+def _run_alternatives(xest: pd.DataFrame, Par, alternatives: list, target_dates,
+                      n_workers: int = None) -> list:
+    """
+    Target nowcasts of every alternative specification, in order.
+    """
+    if not alternatives:
+        return []
+    n_workers = min(n_workers or os.cpu_count() or 1, len(alternatives))
+    with shared_panel(xest) as shm_name:
+        initargs = (shm_name, xest.shape, xest.index, xest.columns, Par, target_dates)
+        if n_workers == 1:
+            _init_range_worker(*initargs)
+            try:
+                return [_range_task(a) for a in alternatives]
+            finally:
+                _release_range_worker()
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_range_worker,
+                                 initargs=initargs) as executor:
+            return list(executor.map(_range_task, alternatives))
+
+
+def _init_range_worker(shm_name, shape, index, columns, Par, target_dates):
+    """
+    Attach the shared panel and store the range settings in the worker.
+    """
+    shm, x = attach_panel(shm_name, shape)
+    _RANGE['shm'] = shm
+    _RANGE['ctx'] = SimpleNamespace(x=x, index=index, columns=columns, Par=Par,
+                                    target_dates=target_dates)
+
+
+def _release_range_worker():
+    """
+    Detach the shared panel in the current process.
+    """
+    _RANGE.pop('ctx', None)
+    shm = _RANGE.pop('shm', None)
+    if shm is not None:
+        shm.close()
+
+
+def _range_task(overrides: dict) -> np.ndarray:
+    """
+    Estimate one alternative specification and return its target nowcasts.
+    """
+    ctx = _RANGE['ctx']
+    Par = copy.copy(ctx.Par)
+    for name, value in overrides.items():
+        setattr(Par, name, value)
+    xv = pd.DataFrame(ctx.x.copy(), index=ctx.index, columns=ctx.columns)
+    target = DFM_estimate(xv, Par).nowcast().iloc[:, -1]
+    return target.reindex(ctx.target_dates).to_numpy()